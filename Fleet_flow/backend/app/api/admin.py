@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from app.core.admin import require_admin
+from app.core.profiling import ProfiledRoute, collapsed_stacks, layer_summary, profile_store
+from app.schemas.profile import ProfileSummary
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)], route_class=ProfiledRoute)
+
+def _summary(profile: dict) -> dict:
+    return {**profile, "layers": layer_summary(profile)}
+
+def _get_profile(profile_id: str) -> dict:
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Profile {profile_id} not found (it may have been evicted)"
+        )
+    return profile
+
+@router.get("/profiles", response_model=list[ProfileSummary])
+def read_profiles():
+    """
+    List the profiles kept by this worker, newest first.
+
+    Profile a request by sending it with "X-Profile: 1" (or ?profile=1) and
+    the X-Admin-Token header; its id comes back in the X-Profile-Id header.
+    """
+    return [_summary(p) for p in profile_store.list()]
+
+@router.get("/profiles/{profile_id}", response_model=ProfileSummary)
+def read_profile(profile_id: str):
+    """Time per layer (router, crud, orm, db, serialization, framework) for one request."""
+    return _summary(_get_profile(profile_id))
+
+@router.get("/profiles/{profile_id}/flamegraph", response_class=PlainTextResponse)
+def read_profile_flamegraph(profile_id: str):
+    """
+    Collapsed stacks for one request, one "frame;frame;... count" line per stack.
+
+    Feed to flamegraph.pl or open in speedscope.app.
+    """
+    profile = _get_profile(profile_id)
+    return PlainTextResponse(
+        collapsed_stacks(profile),
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.folded"'},
+    )
@@ -1,12 +1,63 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from sqlalchemy import func
+from app.core.profiling import ProfiledRoute
 from app.core.database import get_db
 from app.models.expense import Expense
+from app.schemas.analytics import DashboardResponse, LanesResponse
+from app.crud.analytics import get_dashboard
+from app.crud.lanes import get_lanes
+import logging
 
-router = APIRouter(prefix="/analytics", tags=["Analytics"])
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"], route_class=ProfiledRoute)
 
 @router.get("/total-fuel-cost")
 def total_fuel_cost(db: Session = Depends(get_db)):
     total = db.query(func.sum(Expense.fuel_cost)).scalar()
-    return {"total_fuel_cost": total or 0}
\ No newline at end of file
+    return {"total_fuel_cost": total or 0}
+
+@router.get("/dashboard", response_model=DashboardResponse)
+def dashboard(db: Session = Depends(get_db)):
+    """
+    Landing-page summary in one call: vehicles, drivers, trips and
+    maintenance counted by status, plus fuel/misc/maintenance cost totals.
+
+    Returns:
+    - 200 OK: Summary for the request's depot
+    - 500 Internal Server Error: Database error
+    """
+    try:
+        return get_dashboard(db)
+    except ValueError as e:
+        logger.error(f"Error computing dashboard: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.get("/lanes", response_model=LanesResponse)
+def lanes(
+    origin: Optional[str] = Query(None, description="Filter by origin (case-insensitive)"),
+    destination: Optional[str] = Query(None, description="Filter by destination (case-insensitive)"),
+    vehicle_type: Optional[str] = Query(None, description="Filter by vehicle type (case-insensitive)"),
+    min_trips: int = Query(1, ge=1, description="Only lanes with at least this many trips"),
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
+    """
+    Per-lane trip statistics: for each (origin, destination, vehicle type),
+    the mean and variance of fuel cost per unit of cargo, mean fuel and misc
+    costs, and how far past fuel estimates were off. Busiest lanes first.
+
+    Served from an in-memory index that a background loop keeps current
+    (new expenses show up within LANE_REFRESH_SECONDS).
+
+    Returns:
+    - 200 OK: Lanes for the request's depot and whether more follow
+    """
+    results, has_more = get_lanes(db, origin, destination, vehicle_type, min_trips, limit, offset)
+    return {"lanes": results, "has_more": has_more}
@@ -1,15 +1,48 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
+from app.core.profiling import ProfiledRoute
 from app.core.database import get_db
+from app.core.tenancy import DuplicateKeyError, get_depot
+from app.schemas.compliance import ExpiringDriver
 from app.schemas.driver import DriverCreate, DriverResponse
+from app.crud.compliance import get_expiring_drivers
 from app.crud.driver import create_driver, get_drivers
 
-router = APIRouter(prefix="/drivers", tags=["Drivers"])
+router = APIRouter(prefix="/drivers", tags=["Drivers"], route_class=ProfiledRoute)
+
+_WINDOW_UNITS = {"d": 1, "w": 7}
 
 @router.post("/", response_model=DriverResponse)
 def add_driver(driver: DriverCreate, db: Session = Depends(get_db)):
-    return create_driver(db, driver)
+    try:
+        return create_driver(db, driver)
+    except DuplicateKeyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
 
 @router.get("/", response_model=list[DriverResponse])
 def read_drivers(db: Session = Depends(get_db)):
-    return get_drivers(db)
\ No newline at end of file
+    return get_drivers(db)
+
+@router.get("/expiring", response_model=list[ExpiringDriver])
+def read_expiring_drivers(
+    within: str = Query("30d", pattern=r"^\d{1,4}[dw]?$", description="Window such as 30d, 4w or 30 (days)"),
+    include_expired: bool = Query(True, description="Also list licenses that have already expired"),
+    depot: str = Depends(get_depot),
+):
+    """
+    Drivers of the request's depot whose license expires within the window,
+    soonest first.
+
+    Served from the depot's in-memory compliance heap, so it never scans the
+    drivers table.
+
+    Returns:
+    - 200 OK: Expiring drivers (empty list if none)
+    - 422 Unprocessable Entity: Malformed window
+    """
+    unit = within[-1] if within[-1] in _WINDOW_UNITS else "d"
+    days = int(within.rstrip("dw")) * _WINDOW_UNITS[unit]
+    return get_expiring_drivers(depot, days, include_expired=include_expired)
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from app.core.profiling import ProfiledRoute
 from app.core.database import get_db
 from app.schemas.expense import ExpenseCreate, ExpenseResponse
 from app.crud.expense import create_expense, get_expenses
@@ -7,7 +8,7 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/expenses", tags=["Expenses"])
+router = APIRouter(prefix="/expenses", tags=["Expenses"], route_class=ProfiledRoute)
 
 @router.post("/", response_model=ExpenseResponse, status_code=status.HTTP_201_CREATED)
 def add_expense(data: ExpenseCreate, db: Session = Depends(get_db)):
@@ -0,0 +1,80 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from sqlalchemy.orm import Session
+from app.core.profiling import ProfiledRoute
+from app.core.database import get_db
+from app.schemas.import_job import ImportJobResponse
+from app.crud.imports import create_import_job, get_import_job, spool_upload, submit_import
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/import", tags=["Import"], route_class=ProfiledRoute)
+
+def _start_import(kind: str, file: UploadFile, on_conflict: str, db: Session):
+    try:
+        path = spool_upload(file.file)
+        job = create_import_job(db, kind, file.filename, on_conflict)
+    except Exception as e:
+        logger.error(f"Error starting {kind} import: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to start import: {str(e)}"
+        )
+    submit_import(job.id, path, job.depot_id)
+    logger.info(f"Import {job.id} queued: kind={kind}, file={file.filename}")
+    return job
+
+@router.post("/vehicles", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def import_vehicles(
+    file: UploadFile = File(..., description="CSV with columns: plate, model, type, capacity, odometer, status"),
+    on_conflict: Literal["update", "skip"] = Query("update", description="What to do with plates that already exist"),
+    db: Session = Depends(get_db),
+):
+    """
+    Bulk-import vehicles from a CSV file.
+
+    The file is processed in the background in chunks; poll
+    GET /import/{job_id} for progress and row-level errors.
+
+    Returns:
+    - 202 Accepted: Import job queued
+    - 500 Internal Server Error: Upload could not be stored
+    """
+    return _start_import("vehicles", file, on_conflict, db)
+
+@router.post("/drivers", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def import_drivers(
+    file: UploadFile = File(..., description="CSV with columns: name, license_number, expiry_date, status"),
+    on_conflict: Literal["update", "skip"] = Query("update", description="What to do with license numbers that already exist"),
+    db: Session = Depends(get_db),
+):
+    """
+    Bulk-import drivers from a CSV file.
+
+    The file is processed in the background in chunks; poll
+    GET /import/{job_id} for progress and row-level errors.
+
+    Returns:
+    - 202 Accepted: Import job queued
+    - 500 Internal Server Error: Upload could not be stored
+    """
+    return _start_import("drivers", file, on_conflict, db)
+
+@router.get("/{job_id}", response_model=ImportJobResponse)
+def read_import_job(job_id: str, db: Session = Depends(get_db)):
+    """
+    Get progress and errors of an import job.
+
+    Returns:
+    - 200 OK: Job report (status Queued / Running / Completed / Failed)
+    - 404 Not Found: Unknown job_id
+    """
+    job = get_import_job(db, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Import job {job_id} not found"
+        )
+    return job
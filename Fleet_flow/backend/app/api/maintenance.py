@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from app.core.profiling import ProfiledRoute
 from app.core.database import get_db
 from app.schemas.maintenance import MaintenanceCreate, MaintenanceResponse
 from app.crud.maintenance import create_maintenance, get_maintenance
@@ -7,7 +8,7 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/maintenance", tags=["Maintenance"])
+router = APIRouter(prefix="/maintenance", tags=["Maintenance"], route_class=ProfiledRoute)
 
 @router.post("/", response_model=MaintenanceResponse, status_code=status.HTTP_201_CREATED)
 def add_maintenance(data: MaintenanceCreate, db: Session = Depends(get_db)):
@@ -0,0 +1,42 @@
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from app.core.profiling import ProfiledRoute
+from app.core.database import get_db
+from app.schemas.search import SearchResponse
+from app.crud.search import search
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/search", tags=["Search"], route_class=ProfiledRoute)
+
+@router.get("/", response_model=SearchResponse)
+def search_fleet(
+    q: str = Query(..., min_length=1, max_length=100, description="Plate, license number, driver name, or trip origin/destination"),
+    kind: Optional[list[Literal["vehicle", "driver", "trip"]]] = Query(None, description="Restrict to these result kinds"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    db: Session = Depends(get_db),
+):
+    """
+    Search vehicles, drivers and trips.
+
+    Plates and license numbers match by prefix; driver names and trip
+    origins/destinations match by keyword. Results are ranked (exact
+    identifier > identifier prefix > text match) and paginated.
+
+    Returns:
+    - 200 OK: Ranked results (empty list if nothing matches)
+    - 500 Internal Server Error: Database error
+    """
+    try:
+        results, has_more = search(db, q, kind, limit=limit, offset=offset)
+    except ValueError as e:
+        logger.error(f"Error searching: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    return {"query": q, "limit": limit, "offset": offset, "has_more": has_more, "results": results}
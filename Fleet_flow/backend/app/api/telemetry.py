@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from app.core.profiling import ProfiledRoute
+from app.core.database import get_db
+from app.schemas.telemetry import TelemetryAccepted, TelemetryBatch
+from app.crud.telemetry import ingest_readings, telemetry_buffer
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/telemetry", tags=["Telemetry"], route_class=ProfiledRoute)
+
+@router.post("/", response_model=TelemetryAccepted, status_code=status.HTTP_202_ACCEPTED)
+def add_readings(batch: TelemetryBatch, db: Session = Depends(get_db)):
+    """
+    Accept a batch of odometer readings and fuel fill-ups.
+
+    Readings are buffered and committed in groups shortly after the response
+    (within TELEMETRY_FLUSH_MS); each vehicle's odometer moves to its latest
+    reading.
+
+    Returns:
+    - 202 Accepted: Readings queued (readings for unknown vehicles are listed and dropped)
+    - 503 Service Unavailable: Buffer full; retry after Retry-After seconds
+    - 500 Internal Server Error: Database error
+    """
+    try:
+        result = ingest_readings(db, batch.readings)
+    except ValueError as e:
+        logger.error(f"Error ingesting telemetry: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    if result is None:
+        logger.warning(f"Telemetry buffer full, refusing {len(batch.readings)} readings")
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "Telemetry buffer is full, retry shortly"},
+            headers={"Retry-After": "1"},
+        )
+    accepted, rejected = result
+    return TelemetryAccepted(accepted=accepted, rejected_vehicle_ids=rejected)
+
+@router.get("/stats")
+def read_telemetry_stats():
+    """
+    Write buffer counters for this worker process.
+
+    Returns:
+    - 200 OK: Buffered rows, capacity, and accepted/rejected/flushed/dropped totals, flush retries and requeued rows
+    """
+    return telemetry_buffer.stats()
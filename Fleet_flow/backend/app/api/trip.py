@@ -1,13 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
+from app.core.profiling import ProfiledRoute
 from app.core.database import get_db
-from app.schemas.trip import TripCreate, TripResponse
-from app.crud.trip import create_trip, get_trips
+from app.schemas.trip import TripCreate, TripDetailResponse, TripResponse, TripTransition
+from app.crud.trip import create_trip, get_trip_detail, get_trips, get_trips_expanded, transition_trip
+from app.core.trip_states import TripNotFoundError, TripTransitionError
 import logging
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/trips", tags=["Trips"])
+router = APIRouter(prefix="/trips", tags=["Trips"], route_class=ProfiledRoute)
 
 @router.post("/", response_model=TripResponse, status_code=status.HTTP_201_CREATED)
 def add_trip(trip: TripCreate, db: Session = Depends(get_db)):
@@ -18,8 +20,10 @@ def add_trip(trip: TripCreate, db: Session = Depends(get_db)):
     - vehicle_id: Must exist in vehicles table
     - driver_id: Must exist in drivers table
     - origin, destination: Non-empty strings
-    - cargo_weight, fuel_estimate: Positive numbers
-    - status: Trip status (Pending, In Transit, Completed, etc.)
+    - cargo_weight: Positive number
+    - fuel_estimate: Optional; filled in from the lane's trip history when omitted
+    - status: Optional; new trips always start as Draft (legacy "Pending" is accepted).
+      Dispatch, complete or cancel them with PATCH /trips/{id}/transition
     
     Returns:
     - 201 Created: Trip successfully created
@@ -57,4 +61,88 @@ def read_trips(db: Session = Depends(get_db)):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
-        )
\ No newline at end of file
+        )
+
+# Declared before /{trip_id} so "expanded" isn't parsed as an ID
+@router.get("/expanded", response_model=list[TripDetailResponse])
+def read_trips_expanded(
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
+    """
+    Get a page of trips, each with its vehicle, driver, expenses and cost totals.
+
+    Returns:
+    - 200 OK: Page of trips ordered by ID (empty list past the end)
+    - 500 Internal Server Error: Database error
+    """
+    try:
+        return get_trips_expanded(db, limit=limit, offset=offset)
+    except ValueError as e:
+        logger.error(f"Error fetching expanded trips: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.get("/{trip_id}", response_model=TripDetailResponse)
+def read_trip(trip_id: int, db: Session = Depends(get_db)):
+    """
+    Get one trip with its vehicle, driver, expenses and cost totals.
+
+    Returns:
+    - 200 OK: Trip detail
+    - 404 Not Found: trip_id not found
+    - 500 Internal Server Error: Database error
+    """
+    try:
+        return get_trip_detail(db, trip_id)
+    except TripNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except ValueError as e:
+        logger.error(f"Error fetching trip {trip_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.patch("/{trip_id}/transition", response_model=TripResponse)
+def change_trip_status(trip_id: int, data: TripTransition, db: Session = Depends(get_db)):
+    """
+    Move a trip through its lifecycle: Draft -> Dispatched -> Completed,
+    or Draft/Dispatched -> Cancelled.
+
+    Dispatching marks the vehicle and driver "On Trip"; completing or
+    cancelling a dispatched trip makes them available again. All status
+    changes happen in one transaction.
+
+    Returns:
+    - 200 OK: Updated trip
+    - 404 Not Found: trip_id not found
+    - 409 Conflict: Transition not allowed from the current state, or the
+      trip, vehicle or driver was changed by a concurrent request
+    - 500 Internal Server Error: Unexpected database error
+    """
+    try:
+        return transition_trip(db, trip_id, data.status, data.expected_status)
+    except TripNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except TripTransitionError as e:
+        logger.warning(f"Rejected trip transition: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except ValueError as e:
+        logger.error(f"Error transitioning trip: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
@@ -1,14 +1,22 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from app.core.profiling import ProfiledRoute
 from app.core.database import get_db
+from app.core.tenancy import DuplicateKeyError
 from app.schemas.vehicle import VehicleCreate, VehicleResponse
 from app.crud.vehicle import create_vehicle, get_vehicles
 
-router = APIRouter(prefix="/vehicles", tags=["Vehicles"])
+router = APIRouter(prefix="/vehicles", tags=["Vehicles"], route_class=ProfiledRoute)
 
 @router.post("/", response_model=VehicleResponse)
 def add_vehicle(vehicle: VehicleCreate, db: Session = Depends(get_db)):
-    return create_vehicle(db, vehicle)
+    try:
+        return create_vehicle(db, vehicle)
+    except DuplicateKeyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
 
 @router.get("/", response_model=list[VehicleResponse])
 def read_vehicles(db: Session = Depends(get_db)):
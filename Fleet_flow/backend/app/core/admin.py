@@ -0,0 +1,24 @@
+"""Shared-secret gate for admin-only routes and request flags."""
+
+import hmac
+from typing import Optional
+
+from fastapi import Header, HTTPException, status
+
+from app.core.config import ADMIN_TOKEN
+
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
+
+def is_admin_token(value: Optional[str]) -> bool:
+    if not ADMIN_TOKEN or not value:
+        return False
+    return hmac.compare_digest(value.encode(), ADMIN_TOKEN.encode())
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Dependency for admin routes; 404 when admin access is not configured."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token")
@@ -0,0 +1,15 @@
+"""Helpers for the raw ASGI middlewares in app/core."""
+
+import json
+from typing import Optional
+
+
+async def send_json(send, status_code: int, payload: dict, headers: Optional[list] = None) -> None:
+    body = json.dumps(payload).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        + (headers or []),
+    })
+    await send({"type": "http.response.body", "body": body})
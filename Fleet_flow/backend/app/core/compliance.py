@@ -0,0 +1,208 @@
+"""In-process compliance deadline tracker.
+
+Deadlines (driver license expiry today; vehicle inspections once they are
+modeled) live in one binary min-heap per depot, keyed by due date. Updating a deadline
+pushes a new entry and marks the old one stale instead of searching the heap
+for it; stale entries are skipped by readers and dropped when they outnumber
+the live ones.
+
+``due_within(cutoff)`` walks the heap from the root and only descends into
+children that are due on or before ``cutoff``. By the heap property every
+visited entry is either a result or a leaf of the walk, so it touches O(k)
+entries for k results, and sorting them costs O(k log k) - no full scan.
+
+Alerts are delivered through notifiers (``register_notifier``); the default
+one logs, and COMPLIANCE_WEBHOOK_URL adds a JSON webhook.
+"""
+
+import heapq
+import itertools
+import json
+import logging
+import threading
+import urllib.request
+from dataclasses import asdict, dataclass, field
+from datetime import date, timedelta
+from typing import Callable, Optional
+
+from app.core.config import COMPLIANCE_ALERT_DAYS, COMPLIANCE_WEBHOOK_URL
+
+logger = logging.getLogger(__name__)
+
+DRIVER_LICENSE = "driver_license"
+VEHICLE_INSPECTION = "vehicle_inspection"
+
+
+@dataclass(frozen=True)
+class Deadline:
+    kind: str
+    entity_id: int
+    due: date
+    label: str
+    details: dict = field(default_factory=dict, compare=False, hash=False)
+
+    @property
+    def key(self) -> tuple:
+        return (self.kind, self.entity_id)
+
+
+@dataclass(frozen=True)
+class Alert:
+    depot_id: str
+    kind: str
+    entity_id: int
+    label: str
+    due_date: str
+    days_left: int
+    threshold_days: int
+    details: dict
+
+
+def parse_due_date(value) -> Optional[date]:
+    """Parse a stored YYYY-MM-DD string; None for blanks and malformed values."""
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value).strip()[:10])
+    except (TypeError, ValueError):
+        return None
+
+
+class DeadlineHeap:
+    def __init__(self):
+        self._heap: list[tuple] = []  # (due, seq, key)
+        self._live: dict[tuple, tuple] = {}  # key -> (seq, Deadline)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def upsert(self, deadline: Deadline) -> None:
+        with self._lock:
+            current = self._live.get(deadline.key)
+            if current is not None and current[1] == deadline and current[1].details == deadline.details:
+                return
+            seq = next(self._seq)
+            self._live[deadline.key] = (seq, deadline)
+            heapq.heappush(self._heap, (deadline.due, seq, deadline.key))
+            self._maybe_compact()
+
+    def discard(self, kind: str, entity_id: int) -> None:
+        with self._lock:
+            if self._live.pop((kind, entity_id), None) is not None:
+                self._maybe_compact()
+
+    def replace_all(self, deadlines) -> None:
+        """Swap in a freshly loaded set of deadlines (heapify is O(n))."""
+        live = {}
+        seq = itertools.count()
+        for deadline in deadlines:
+            live[deadline.key] = (next(seq), deadline)
+        heap = [(d.due, s, key) for key, (s, d) in live.items()]
+        heapq.heapify(heap)
+        with self._lock:
+            self._heap, self._live, self._seq = heap, live, seq
+
+    def due_within(self, cutoff: date, kinds=None, since: Optional[date] = None) -> list[Deadline]:
+        """Live deadlines due on or before ``cutoff`` (and on/after ``since``), soonest first."""
+        results = []
+        with self._lock:
+            heap, live = self._heap, self._live
+            stack = [0] if heap else []
+            while stack:
+                i = stack.pop()
+                due, seq, key = heap[i]
+                if due > cutoff:
+                    continue
+                current = live.get(key)
+                if current is not None and current[0] == seq:
+                    deadline = current[1]
+                    if (kinds is None or deadline.kind in kinds) and (since is None or due >= since):
+                        results.append(deadline)
+                for child in (2 * i + 1, 2 * i + 2):
+                    if child < len(heap):
+                        stack.append(child)
+        results.sort(key=lambda d: (d.due, d.kind, d.entity_id))
+        return results
+
+    def _maybe_compact(self) -> None:
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._live):
+            self._heap = [(d.due, seq, key) for key, (seq, d) in self._live.items()]
+            heapq.heapify(self._heap)
+
+
+# ----------------------------------------
+# Notifiers
+# ----------------------------------------
+
+Notifier = Callable[[Alert], None]
+
+_notifiers: list[tuple[str, Notifier]] = []
+
+
+def register_notifier(name: str, notifier: Notifier) -> None:
+    """Deliver every fired alert to ``notifier`` as well (e.g. email, SMS, chat)."""
+    _notifiers.append((name, notifier))
+
+
+def log_notifier(alert: Alert) -> None:
+    when = f"in {alert.days_left} days" if alert.days_left >= 0 else f"{-alert.days_left} days ago"
+    logger.warning(f"Compliance [{alert.depot_id}]: {alert.kind} for {alert.label} expires {alert.due_date} ({when})")
+
+
+def webhook_notifier(url: str, timeout: float = 5.0) -> Notifier:
+    def notify(alert: Alert) -> None:
+        request = urllib.request.Request(
+            url, data=json.dumps(asdict(alert)).encode(), headers={"Content-Type": "application/json"}, method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=timeout):
+            pass
+    return notify
+
+
+register_notifier("log", log_notifier)
+if COMPLIANCE_WEBHOOK_URL:
+    register_notifier("webhook", webhook_notifier(COMPLIANCE_WEBHOOK_URL))
+
+
+def notify(alert: Alert) -> None:
+    for name, notifier in _notifiers:
+        try:
+            notifier(alert)
+        except Exception as e:
+            logger.error(f"Compliance notifier {name} failed for {alert.kind} {alert.entity_id}: {str(e)}")
+
+
+def pending_alerts(depot: str, heap: DeadlineHeap, today: date, thresholds=COMPLIANCE_ALERT_DAYS) -> list[Alert]:
+    """
+    The alert due for each deadline inside the widest threshold, including
+    deadlines already past. Only the tightest threshold reached is reported,
+    so a deadline first seen 3 days out alerts once at 7 days, not at 30 too.
+    """
+    if not thresholds:
+        return []
+    alerts = []
+    for deadline in heap.due_within(today + timedelta(days=max(thresholds))):
+        days_left = (deadline.due - today).days
+        alerts.append(Alert(
+            depot_id=depot,
+            kind=deadline.kind,
+            entity_id=deadline.entity_id,
+            label=deadline.label,
+            due_date=deadline.due.isoformat(),
+            days_left=days_left,
+            threshold_days=min(t for t in thresholds if days_left <= t),
+            details=dict(deadline.details),
+        ))
+    return alerts
+
+
+class DeadlineHeaps(dict):
+    """Per-depot heaps, created on first access."""
+
+    def __missing__(self, depot: str) -> DeadlineHeap:
+        return self.setdefault(depot, DeadlineHeap())
+
+
+deadline_heaps = DeadlineHeaps()
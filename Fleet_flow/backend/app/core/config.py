@@ -35,4 +35,115 @@ DB_PASSWORD_ENCODED = quote(DB_PASSWORD, safe="")
 
 DATABASE_URL = (
     f"mysql+pymysql://{DB_USER_ENCODED}:{DB_PASSWORD_ENCODED}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-)
\ No newline at end of file
+)
+# Idempotency-Key support for POST routes.
+# "memory" keeps keys in a per-process LRU; "database" also persists them in the
+# idempotency_keys table so replays survive restarts and span worker processes.
+IDEMPOTENCY_BACKEND = os.getenv("IDEMPOTENCY_BACKEND", "memory").lower()
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))
+
+ENVIRONMENT = os.getenv("ENVIRONMENT", "development").lower()
+
+# Connection pool sizing (per worker process)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Connections opened at worker startup so the first requests don't pay for the handshake
+DB_POOL_WARM = int(os.getenv("DB_POOL_WARM", str(DB_POOL_SIZE)))
+# SQL echo is useful in development but costs a log line per statement
+DB_ECHO = os.getenv("DB_ECHO", "false" if ENVIRONMENT == "production" else "true").lower() == "true"
+
+# Depots (tenants). Every fleet row carries a depot_id and each request works
+# inside one depot, picked with the X-Depot header (DEFAULT_DEPOT if absent).
+DEFAULT_DEPOT = os.getenv("DEFAULT_DEPOT", "main")
+# Optional allow-list of depot ids; empty accepts any well-formed id
+DEPOTS = [d.strip() for d in os.getenv("DEPOTS", "").split(",") if d.strip()]
+# Optional shard map "depot=url;depot=url": these depots live in their own
+# database instead of DATABASE_URL.
+DEPOT_DATABASE_URLS = {
+    depot.strip(): url.strip()
+    for depot, _, url in (
+        entry.partition("=") for entry in os.getenv("DEPOT_DATABASE_URLS", "").split(";")
+    )
+    if depot.strip() and url.strip()
+}
+
+# Production launcher (python -m app.server)
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", str(os.cpu_count() or 1)))
+SERVER_GRACEFUL_TIMEOUT = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
+
+# GET /search: "auto" uses MySQL FULLTEXT/prefix indexes on MySQL and the
+# in-process n-gram index on any other database; "memory" forces the latter.
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto").lower()
+# How often the in-process index picks up rows inserted by other workers
+SEARCH_INDEX_REFRESH_SECONDS = float(os.getenv("SEARCH_INDEX_REFRESH_SECONDS", "2"))
+# Full reload interval; picks up rows whose ids committed out of order (0 disables)
+SEARCH_INDEX_RELOAD_SECONDS = float(os.getenv("SEARCH_INDEX_RELOAD_SECONDS", "3600"))
+
+# Per-client token buckets by route class, as "<requests per second>/<burst>"
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_READS = os.getenv("RATE_LIMIT_READS", "20/40")
+RATE_LIMIT_WRITES = os.getenv("RATE_LIMIT_WRITES", "10/20")
+RATE_LIMIT_ANALYTICS = os.getenv("RATE_LIMIT_ANALYTICS", "2/5")
+RATE_LIMIT_EXPORTS = os.getenv("RATE_LIMIT_EXPORTS", "0.2/2")
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
+
+# Load shedding: in-flight DB-bound requests per worker are capped at
+# LOAD_SHED_FACTOR x (DB_POOL_SIZE + DB_MAX_OVERFLOW); this share of the cap is
+# reserved for writes so dashboards cannot starve drivers.
+LOAD_SHED_ENABLED = os.getenv("LOAD_SHED_ENABLED", "true").lower() == "true"
+LOAD_SHED_FACTOR = float(os.getenv("LOAD_SHED_FACTOR", "1.0"))
+LOAD_SHED_WRITE_RESERVE = float(os.getenv("LOAD_SHED_WRITE_RESERVE", "0.25"))
+
+# Bulk CSV import (/import/vehicles, /import/drivers)
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "500"))
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "100"))  # error rows kept per job report
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", "2"))  # imports run concurrently per worker process
+
+# Admin-only endpoints (/admin/*) and on-demand profiling require the
+# X-Admin-Token header to match ADMIN_TOKEN; they are disabled when it is unset.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Per-request sampling profiler. A request is profiled when an admin sends
+# "X-Profile: 1" (or ?profile=1), or at random for PROFILE_SAMPLE_PERCENT of requests.
+PROFILE_SAMPLE_PERCENT = float(os.getenv("PROFILE_SAMPLE_PERCENT", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "2"))
+PROFILE_RING_SIZE = int(os.getenv("PROFILE_RING_SIZE", "50"))
+
+# Compliance alerts (license expiry). An alert fires once per deadline when it
+# comes within each of COMPLIANCE_ALERT_DAYS days.
+COMPLIANCE_ALERT_DAYS = sorted(
+    (int(d) for d in os.getenv("COMPLIANCE_ALERT_DAYS", "30,7,1").split(",") if d.strip()),
+    reverse=True,
+)
+COMPLIANCE_CHECK_SECONDS = float(os.getenv("COMPLIANCE_CHECK_SECONDS", "300"))
+# Full reload from the database, to pick up changes made by other workers
+COMPLIANCE_RELOAD_SECONDS = float(os.getenv("COMPLIANCE_RELOAD_SECONDS", "900"))
+# Optional: POST each alert as JSON to this URL (alerts are always logged)
+COMPLIANCE_WEBHOOK_URL = os.getenv("COMPLIANCE_WEBHOOK_URL")
+
+# Telemetry ingestion (POST /telemetry). Readings are buffered per worker and
+# written in group commits of up to TELEMETRY_FLUSH_SIZE rows, at least every
+# TELEMETRY_FLUSH_MS. A full buffer answers 503 + Retry-After.
+TELEMETRY_BUFFER_SIZE = int(os.getenv("TELEMETRY_BUFFER_SIZE", "50000"))
+TELEMETRY_FLUSH_SIZE = int(os.getenv("TELEMETRY_FLUSH_SIZE", "2000"))
+TELEMETRY_FLUSH_MS = float(os.getenv("TELEMETRY_FLUSH_MS", "500"))
+# Retries of a flush failing with a transient error (deadlock, lost connection)
+TELEMETRY_FLUSH_RETRIES = int(os.getenv("TELEMETRY_FLUSH_RETRIES", "3"))
+TELEMETRY_MAX_BATCH = int(os.getenv("TELEMETRY_MAX_BATCH", "1000"))
+
+# GET /analytics/dashboard: seconds a depot's summary is reused before it is
+# recomputed (0 disables caching).
+DASHBOARD_CACHE_SECONDS = float(os.getenv("DASHBOARD_CACHE_SECONDS", "2"))
+
+# Lane statistics (GET /analytics/lanes, fuel_estimate auto-fill)
+# Trips a lane needs before create_trip fills in fuel_estimate from it
+LANE_MIN_TRIPS = int(os.getenv("LANE_MIN_TRIPS", "3"))
+# Background catch-up interval for expenses recorded by other workers (0 disables)
+LANE_REFRESH_SECONDS = float(os.getenv("LANE_REFRESH_SECONDS", "5"))
+# Full recomputation interval, run by the same background loop
+LANE_REBUILD_SECONDS = float(os.getenv("LANE_REBUILD_SECONDS", "3600"))
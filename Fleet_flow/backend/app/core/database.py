@@ -1,10 +1,40 @@
+import threading
 from typing import Generator
 
+from fastapi import Depends
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session, sessionmaker, declarative_base
-from app.core.config import DATABASE_URL
+from app.core.config import (
+    DATABASE_URL,
+    DB_ECHO,
+    DB_MAX_OVERFLOW,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DEPOT_DATABASE_URLS,
+)
+from app.core.tenancy import get_depot
+
+
+def _create_engine(url: str) -> Engine:
+    return create_engine(
+        url,
+        echo=DB_ECHO,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+
 
-engine = create_engine(DATABASE_URL, echo=True)
+engine = _create_engine(DATABASE_URL)
+
+# Most connections a worker can hold at once; load shedding is sized from this.
+POOL_CAPACITY = DB_POOL_SIZE + DB_MAX_OVERFLOW
+
+# Engines for depots in the shard map, created on first use (one per URL)
+_shard_engines: dict[str, Engine] = {}
+_shard_lock = threading.Lock()
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -15,9 +45,37 @@ SessionLocal = sessionmaker(
 Base = declarative_base()
 
 
-def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
+def engine_for(depot: str) -> Engine:
+    url = DEPOT_DATABASE_URLS.get(depot)
+    if not url:
+        return engine
+    with _shard_lock:
+        shard = _shard_engines.get(url)
+        if shard is None:
+            shard = _shard_engines[url] = _create_engine(url)
+        return shard
+
+
+def all_engines() -> list[Engine]:
+    """The default engine followed by one engine per distinct shard URL."""
+    return [engine] + list({engine_for(depot) for depot in sorted(DEPOT_DATABASE_URLS)})
+
+
+def dispose_engines() -> None:
+    engine.dispose()
+    with _shard_lock:
+        for shard in _shard_engines.values():
+            shard.dispose()
+
+
+def depot_session(depot: str) -> Session:
+    """A session on the depot's database that only reads and writes that depot's rows."""
+    return SessionLocal(bind=engine_for(depot), info={"depot_id": depot})
+
+
+def get_db(depot: str = Depends(get_depot)) -> Generator[Session, None, None]:
+    db = depot_session(depot)
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
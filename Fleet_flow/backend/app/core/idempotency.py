@@ -0,0 +1,356 @@
+"""Idempotency-Key support for POST routes.
+
+Clients that retry a POST send the same ``Idempotency-Key`` header on every
+attempt. The first request runs normally and its response is stored; retries
+replay that response without reaching the routers (and therefore without
+touching the entity tables). A retry that arrives while the first request is
+still running waits for it instead of racing it.
+
+Keys are scoped to method + path + depot (X-Depot), expire after ``IDEMPOTENCY_TTL_SECONDS`` and
+are bounded by an LRU of ``IDEMPOTENCY_MAX_KEYS`` entries per process. With
+``IDEMPOTENCY_BACKEND=database`` the keys are also written to the
+``idempotency_keys`` table so they are shared between workers.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from starlette.concurrency import run_in_threadpool
+
+from app.core.asgi import send_json
+from app.core.config import (
+    IDEMPOTENCY_BACKEND,
+    IDEMPOTENCY_MAX_KEYS,
+    IDEMPOTENCY_TTL_SECONDS,
+    IDEMPOTENCY_WAIT_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+DEPOT_HEADER = b"x-depot"
+REPLAYED_HEADER = b"idempotent-replayed"
+MAX_KEY_LENGTH = 255
+# How long an in-flight claim blocks duplicates if its owner dies without releasing it.
+IN_FLIGHT_LEASE_SECONDS = 300
+
+
+@dataclass
+class StoredResponse:
+    fingerprint: str
+    expires_at: float
+    status_code: Optional[int] = None  # None while the first request is in flight
+    headers: list = field(default_factory=list)
+    body: bytes = b""
+
+    @property
+    def in_flight(self) -> bool:
+        return self.status_code is None
+
+
+class MemoryIdempotencyStore:
+    """Per-process LRU of idempotency keys with TTL eviction."""
+
+    blocking = False
+
+    def __init__(self, max_keys: int = IDEMPOTENCY_MAX_KEYS, ttl_seconds: int = IDEMPOTENCY_TTL_SECONDS):
+        self.max_keys = max_keys
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, StoredResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def claim(self, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        """
+        Reserve ``key`` for the caller.
+
+        Returns None if the caller now owns the key and must run the request,
+        otherwise the existing (possibly in-flight) entry.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > now:
+                self._entries.move_to_end(key)
+                return entry
+            self._entries[key] = StoredResponse(fingerprint=fingerprint, expires_at=now + self._lease())
+            self._entries.move_to_end(key)
+            self._evict(now)
+            return None
+
+    def complete(self, key: str, entry: StoredResponse) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict(time.time())
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _lease(self) -> float:
+        return min(self.ttl_seconds, IN_FLIGHT_LEASE_SECONDS)
+
+    def _evict(self, now: float) -> None:
+        # Oldest entries sit at the front; drop expired ones and trim to size.
+        # In-flight entries are never evicted so waiters can still find them.
+        for key in list(self._entries):
+            entry = self._entries[key]
+            if entry.expires_at > now and len(self._entries) <= self.max_keys:
+                break
+            if not entry.in_flight:
+                del self._entries[key]
+
+
+class DatabaseIdempotencyStore(MemoryIdempotencyStore):
+    """
+    Idempotency store backed by the idempotency_keys table.
+
+    The in-memory LRU is kept in front of the table as a read-through cache
+    for completed responses; the table is the source of truth for claims so
+    that duplicates hitting different workers are detected as well.
+    """
+
+    blocking = True
+
+    def claim(self, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        with self._lock:
+            cached = self._entries.get(key)
+        if cached is not None and not cached.in_flight and cached.expires_at > time.time():
+            return cached
+
+        from app.core.database import SessionLocal
+        from app.models.idempotency import IdempotencyRecord
+
+        db = SessionLocal()
+        try:
+            now = time.time()
+            db.query(IdempotencyRecord).filter(
+                IdempotencyRecord.key == key,
+                IdempotencyRecord.expires_at <= now,
+            ).delete(synchronize_session=False)
+            db.add(IdempotencyRecord(key=key, fingerprint=fingerprint, expires_at=now + self._lease()))
+            try:
+                db.commit()
+                return None
+            except IntegrityError:
+                db.rollback()
+            record = db.query(IdempotencyRecord).filter(IdempotencyRecord.key == key).first()
+            if record is None:
+                # Released between our insert and the lookup; let the caller retry the claim.
+                return StoredResponse(fingerprint=fingerprint, expires_at=now)
+            entry = StoredResponse(
+                fingerprint=record.fingerprint,
+                expires_at=record.expires_at,
+                status_code=record.status_code,
+                headers=[(k.encode("latin-1"), v.encode("latin-1")) for k, v in json.loads(record.headers or "[]")],
+                body=record.body or b"",
+            )
+            if not entry.in_flight:
+                super().complete(key, entry)
+            return entry
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Database error claiming idempotency key: {str(e)}")
+            raise
+        finally:
+            db.close()
+
+    def complete(self, key: str, entry: StoredResponse) -> None:
+        from app.core.database import SessionLocal
+        from app.models.idempotency import IdempotencyRecord
+
+        super().complete(key, entry)
+        db = SessionLocal()
+        try:
+            db.query(IdempotencyRecord).filter(IdempotencyRecord.key == key).update({
+                IdempotencyRecord.status_code: entry.status_code,
+                IdempotencyRecord.headers: json.dumps(
+                    [[k.decode("latin-1"), v.decode("latin-1")] for k, v in entry.headers]
+                ),
+                IdempotencyRecord.body: entry.body,
+                IdempotencyRecord.expires_at: entry.expires_at,
+            }, synchronize_session=False)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Database error storing idempotent response: {str(e)}")
+        finally:
+            db.close()
+
+    def release(self, key: str) -> None:
+        from app.core.database import SessionLocal
+        from app.models.idempotency import IdempotencyRecord
+
+        super().release(key)
+        db = SessionLocal()
+        try:
+            db.query(IdempotencyRecord).filter(
+                IdempotencyRecord.key == key,
+                IdempotencyRecord.status_code.is_(None),
+            ).delete(synchronize_session=False)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Database error releasing idempotency key: {str(e)}")
+        finally:
+            db.close()
+
+
+def build_idempotency_store() -> MemoryIdempotencyStore:
+    if IDEMPOTENCY_BACKEND == "database":
+        return DatabaseIdempotencyStore()
+    return MemoryIdempotencyStore()
+
+
+class IdempotencyMiddleware:
+    """ASGI middleware that makes POST requests with an Idempotency-Key retry-safe."""
+
+    poll_interval = 0.05
+
+    def __init__(self, app, store: Optional[MemoryIdempotencyStore] = None,
+                 wait_seconds: float = IDEMPOTENCY_WAIT_SECONDS):
+        self.app = app
+        self.store = store or build_idempotency_store()
+        self.wait_seconds = wait_seconds
+        self._inflight: dict[str, asyncio.Event] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        header_value = dict(scope["headers"]).get(IDEMPOTENCY_HEADER)
+        if header_value is None:
+            await self.app(scope, receive, send)
+            return
+        if not header_value or len(header_value) > MAX_KEY_LENGTH:
+            await send_json(send, 400, {"detail": f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"})
+            return
+
+        body = await _read_body(receive)
+        # The same key sent to two depots is two different requests
+        depot = dict(scope["headers"]).get(DEPOT_HEADER, b"").strip().lower()
+        key = hashlib.sha256(b"POST " + scope["path"].encode() + b" " + depot + b" " + header_value).hexdigest()
+        fingerprint = _fingerprint(body, dict(scope["headers"]).get(b"content-type", b""))
+
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            existing = await self._claim(key, fingerprint)
+            if existing is None:
+                break
+            if existing.fingerprint != fingerprint:
+                await send_json(send, 422, {"detail": "Idempotency-Key was already used with a different request body"})
+                return
+            if not existing.in_flight:
+                logger.info(f"Replaying idempotent response for {scope['path']}")
+                await _replay(send, existing)
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                await send_json(send, 409, {"detail": "A request with this Idempotency-Key is still in progress"},
+                                 headers=[(b"retry-after", b"1")])
+                return
+            event = self._inflight.get(key)
+            try:
+                if event is not None:
+                    await asyncio.wait_for(event.wait(), timeout=remaining)
+                else:
+                    # Owned by another worker process; poll the shared store.
+                    await asyncio.sleep(min(self.poll_interval, remaining))
+            except asyncio.TimeoutError:
+                pass
+
+        event = self._inflight[key] = asyncio.Event()
+        captured = StoredResponse(fingerprint=fingerprint, expires_at=time.time() + self.store.ttl_seconds)
+        chunks = []
+        body_sent = False
+
+        async def replay_receive():
+            # The buffered body is delivered once; after that the original
+            # channel reports the real disconnect, if any.
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def capture_send(message):
+            if message["type"] == "http.response.start":
+                captured.status_code = message["status"]
+                captured.headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except BaseException:
+            await self._release(key)
+            raise
+        else:
+            if captured.status_code is not None and captured.status_code < 500:
+                captured.body = b"".join(chunks)
+                await self._complete(key, captured)
+            else:
+                # Server errors are not cached so the client can retry them.
+                await self._release(key)
+        finally:
+            self._inflight.pop(key, None)
+            event.set()
+
+    async def _claim(self, key, fingerprint):
+        if self.store.blocking:
+            return await run_in_threadpool(self.store.claim, key, fingerprint)
+        return self.store.claim(key, fingerprint)
+
+    async def _complete(self, key, entry):
+        if self.store.blocking:
+            await run_in_threadpool(self.store.complete, key, entry)
+        else:
+            self.store.complete(key, entry)
+
+    async def _release(self, key):
+        if self.store.blocking:
+            await run_in_threadpool(self.store.release, key)
+        else:
+            self.store.release(key)
+
+
+def _fingerprint(body: bytes, content_type: bytes) -> str:
+    """
+    Hash of the request body. JSON bodies are hashed in canonical form, so a
+    client that re-serializes the same payload (key order, whitespace) on
+    retry still matches.
+    """
+    if content_type.split(b";")[0].strip().lower() == b"application/json":
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode()
+        except ValueError:
+            pass
+    return hashlib.sha256(body).hexdigest()
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+async def _replay(send, entry: StoredResponse) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": entry.status_code,
+        "headers": list(entry.headers) + [(REPLAYED_HEADER, b"true")],
+    })
+    await send({"type": "http.response.body", "body": entry.body})
@@ -0,0 +1,226 @@
+"""In-process lane statistics for fuel estimation.
+
+A lane is a normalized (origin, destination, vehicle type). Each completed
+trip with expenses and a positive cargo weight contributes one sample per
+lane (trips still running or cancelled have partial or abandoned costs):
+
+- x = total fuel cost / cargo weight (fuel cost per unit of cargo);
+- its total misc and fuel cost;
+- |total fuel cost - fuel_estimate| when the trip had an estimate.
+
+Lanes keep only running sums (count, sum x, sum x^2, ...), so samples are
+added, removed or merged in O(1) and mean/variance come straight from the
+sums. Every sample is also added to the route-level lane (origin,
+destination, ANY_TYPE), used as a fallback when a vehicle type has too
+little history.
+
+Per-trip samples are kept only for trips completed inside the catch-up
+window (the last minute or so of completions), where setting a trip's sample
+has to be idempotent because the same trip may be read more than once. Older
+trips exist only in the lane sums, so memory grows with the number of lanes,
+not trips.
+
+One index per depot (``lane_indexes[depot]``), kept current by
+app.crud.lanes.
+"""
+
+import math
+import threading
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from app.core.search_index import normalize
+
+ANY_TYPE = "*"
+
+
+class Sample(NamedTuple):
+    fuel: float
+    misc: float
+    weight: float
+    estimate: Optional[float]
+
+
+def lane_key(origin: str, destination: str, vehicle_type: str) -> tuple:
+    return normalize(origin), normalize(destination), normalize(vehicle_type) or "unknown"
+
+
+class LaneAccumulator:
+    __slots__ = ("trips", "sum_x", "sum_x2", "sum_fuel", "sum_misc", "estimated", "sum_abs_error")
+
+    def __init__(self):
+        self.trips = 0
+        self.sum_x = 0.0
+        self.sum_x2 = 0.0
+        self.sum_fuel = 0.0
+        self.sum_misc = 0.0
+        self.estimated = 0  # trips that had a fuel_estimate
+        self.sum_abs_error = 0.0
+
+    def add(self, sample: Sample, sign: int = 1) -> None:
+        x = sample.fuel / sample.weight
+        self.trips += sign
+        self.sum_x += sign * x
+        self.sum_x2 += sign * x * x
+        self.sum_fuel += sign * sample.fuel
+        self.sum_misc += sign * sample.misc
+        if sample.estimate is not None:
+            self.estimated += sign
+            self.sum_abs_error += sign * abs(sample.fuel - sample.estimate)
+
+    def merge(self, trips, sum_x, sum_x2, sum_fuel, sum_misc, estimated, sum_abs_error) -> None:
+        self.trips += trips
+        self.sum_x += sum_x
+        self.sum_x2 += sum_x2
+        self.sum_fuel += sum_fuel
+        self.sum_misc += sum_misc
+        self.estimated += estimated
+        self.sum_abs_error += sum_abs_error
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum_x / self.trips if self.trips else None
+
+    @property
+    def variance(self) -> Optional[float]:
+        if self.trips < 2:
+            return None
+        # Sample variance from the running sums; clamp float noise below zero
+        return max(0.0, (self.sum_x2 - self.sum_x * self.sum_x / self.trips) / (self.trips - 1))
+
+    def as_dict(self) -> dict:
+        variance = self.variance
+        return {
+            "trips": self.trips,
+            "fuel_per_weight_mean": self.mean,
+            "fuel_per_weight_variance": variance,
+            "fuel_per_weight_stddev": math.sqrt(variance) if variance is not None else None,
+            "fuel_cost_mean": self.sum_fuel / self.trips if self.trips else None,
+            "misc_cost_mean": self.sum_misc / self.trips if self.trips else None,
+            "estimate_mae": self.sum_abs_error / self.estimated if self.estimated else None,
+        }
+
+
+def _add_to_lanes(lanes: dict, key: tuple, sample: Sample, sign: int = 1) -> None:
+    for k in (key, (key[0], key[1], ANY_TYPE)):
+        lane = lanes.get(k)
+        if lane is None:
+            lane = lanes[k] = LaneAccumulator()
+        lane.add(sample, sign)
+
+
+class LaneIndex:
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._lanes: dict[tuple, LaneAccumulator] = {}
+        # Trips completed inside the catch-up window: trip id -> (lane key, Sample, completed_at)
+        self._recent: dict[int, tuple] = {}
+        # Held by whoever runs a catch-up or rebuild
+        self.refresh_lock = threading.Lock()
+        # Highest expense id and trips.completed_at applied, for the catch-up query
+        self.watermark = 0
+        self.completed_watermark: Optional[datetime] = None
+        self.rebuilt_at = 0.0
+
+    def __len__(self) -> int:
+        return sum(1 for key in self._lanes if key[2] != ANY_TYPE)
+
+    def set_sample(self, trip_id: int, key: tuple, sample: Sample, completed_at: datetime) -> None:
+        """Make ``sample`` a recent trip's contribution, replacing any previous one."""
+        with self._lock:
+            self._set(trip_id, key, sample, completed_at)
+
+    def _set(self, trip_id: int, key: tuple, sample: Sample, completed_at: datetime) -> None:
+        previous = self._recent.get(trip_id)
+        if previous is not None:
+            _add_to_lanes(self._lanes, previous[0], previous[1], sign=-1)
+        _add_to_lanes(self._lanes, key, sample)
+        self._recent[trip_id] = (key, sample, completed_at)
+
+    def apply_delta(self, key: tuple, old: Optional[Sample], new: Sample) -> None:
+        """Replace the ``old`` sample (None if it wasn't counted) of a trip outside the window with ``new``."""
+        with self._lock:
+            if old is not None:
+                _add_to_lanes(self._lanes, key, old, sign=-1)
+            _add_to_lanes(self._lanes, key, new)
+
+    def add_expense(self, trip_id: int, expense_id: int, fuel: float, misc: float) -> bool:
+        """
+        Fold one new expense into a recent trip's sample. Expenses at or below
+        the watermark are already counted, and other trips are left to the
+        next catch-up; both return False.
+        """
+        with self._lock:
+            entry = self._recent.get(trip_id)
+            if expense_id <= self.watermark or entry is None:
+                return False
+            key, sample, completed_at = entry
+            self._set(trip_id, key, sample._replace(fuel=sample.fuel + fuel, misc=sample.misc + misc),
+                      completed_at)
+            return True
+
+    def replace(self, lanes: dict, recent: dict, watermark: int,
+                completed_watermark: Optional[datetime]) -> None:
+        """
+        Swap in a full rebuild: ``lanes`` holds the sums of trips completed
+        before the window, ``recent`` maps the window's trips to
+        (lane key, Sample, completed_at).
+        """
+        for key, sample, _ in recent.values():
+            _add_to_lanes(lanes, key, sample)
+        with self._lock:
+            self._lanes = lanes
+            self._recent = recent
+            self.watermark = watermark
+            self.completed_watermark = completed_watermark
+            self.enabled = True
+
+    def advance(self, watermark: int, completed_watermark: Optional[datetime],
+                window_start: Optional[datetime]) -> None:
+        """Move the watermarks and forget the samples of trips completed at or before ``window_start``."""
+        with self._lock:
+            self.watermark = max(self.watermark, watermark)
+            if completed_watermark is not None:
+                self.completed_watermark = max(self.completed_watermark or completed_watermark, completed_watermark)
+            if window_start is not None:
+                self._recent = {id: entry for id, entry in self._recent.items() if entry[2] > window_start}
+
+    def estimate(self, key: tuple, cargo_weight: float, min_trips: int) -> Optional[float]:
+        """Expected fuel cost for ``cargo_weight`` on this lane, else on its route; None without history."""
+        if not cargo_weight or cargo_weight <= 0:
+            return None
+        with self._lock:
+            for k in (key, (key[0], key[1], ANY_TYPE)):
+                lane = self._lanes.get(k)
+                if lane is not None and lane.trips >= min_trips:
+                    return round(lane.mean * cargo_weight, 2)
+        return None
+
+    def lanes(self, origin: Optional[str] = None, destination: Optional[str] = None,
+              vehicle_type: Optional[str] = None, min_trips: int = 1) -> list[dict]:
+        """Per-type lanes matching the (normalized) filters, busiest first."""
+        origin, destination = normalize(origin) or None, normalize(destination) or None
+        vehicle_type = normalize(vehicle_type) or None
+        with self._lock:
+            matches = [
+                {"origin": k[0], "destination": k[1], "vehicle_type": k[2], **lane.as_dict()}
+                for k, lane in self._lanes.items()
+                if k[2] != ANY_TYPE
+                and lane.trips >= min_trips
+                and (origin is None or k[0] == origin)
+                and (destination is None or k[1] == destination)
+                and (vehicle_type is None or k[2] == vehicle_type)
+            ]
+        matches.sort(key=lambda lane: (-lane["trips"], lane["origin"], lane["destination"], lane["vehicle_type"]))
+        return matches
+
+
+class LaneIndexes(dict):
+    """Per-depot lane indexes, created on first access."""
+
+    def __missing__(self, depot: str) -> LaneIndex:
+        return self.setdefault(depot, LaneIndex())
+
+
+lane_indexes = LaneIndexes()
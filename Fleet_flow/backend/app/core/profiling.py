@@ -0,0 +1,262 @@
+"""On-demand sampling profiler for individual requests.
+
+A profiled request gets a sampler thread that snapshots the stacks of the
+threads working on that request every ``PROFILE_INTERVAL_MS``:
+
+- the event loop thread, but only while the request's own task is running;
+- threadpool workers while they run the request's sync endpoint. Routers use
+  ``ProfiledRoute``, whose endpoints register their thread under the
+  request's profile for the duration of the call.
+
+Samples are folded into collapsed stacks (the input format of flamegraph.pl
+and speedscope) and attributed to a layer: router (app/api), crud (app/crud),
+orm (SQLAlchemy query building and row hydration), db (driver and connection
+pool), serialization (Pydantic, JSON encoding, response rendering) or
+framework. The last ``PROFILE_RING_SIZE`` profiles are kept in memory and
+served by /admin/profiles.
+"""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import logging
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs
+
+from fastapi.routing import APIRoute
+
+from app.core.admin import is_admin_token
+from app.core.config import PROFILE_INTERVAL_MS, PROFILE_RING_SIZE, PROFILE_SAMPLE_PERCENT
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+ADMIN_TOKEN_HEADER = b"x-admin-token"
+
+_APP_DIR = str(Path(__file__).resolve().parent.parent)
+_API_DIR = _APP_DIR + "/api/"
+_CRUD_DIR = _APP_DIR + "/crud/"
+
+_active_profile: contextvars.ContextVar = contextvars.ContextVar("active_profile", default=None)
+# Threadpool thread ident -> profile of the request whose endpoint it is running
+_thread_profiles: dict = {}
+
+# Ordered from most to least specific; the first match walking from the leaf
+# frame towards the root decides the sample's layer.
+_LAYER_PATHS = (
+    ("db", ("/pymysql/", "/MySQLdb/", "/sqlite3/", "/sqlalchemy/pool/", "/sqlalchemy/dialects/",
+            "/sqlalchemy/engine/base.py", "/sqlalchemy/engine/default.py", "/sqlalchemy/engine/cursor.py")),
+    ("orm", ("/sqlalchemy/",)),
+    ("serialization", ("/pydantic/", "/pydantic_core/", "/fastapi/encoders.py", "/json/", "/starlette/responses.py")),
+)
+_SERIALIZATION_FUNCTIONS = {"serialize_response", "_prepare_response_content"}
+_FRAMEWORK_PATHS = ("/fastapi/", "/starlette/", "/anyio/", "/uvicorn/")
+
+
+class ProfileStore:
+    """Bounded ring buffer of finished profiles, newest last."""
+
+    def __init__(self, size: int = PROFILE_RING_SIZE):
+        self.size = size
+        self._profiles: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: dict) -> None:
+        with self._lock:
+            self._profiles[profile["id"]] = profile
+            while len(self._profiles) > self.size:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> list[dict]:
+        with self._lock:
+            return list(reversed(self._profiles.values()))
+
+
+profile_store = ProfileStore()
+
+
+class _Profile:
+    def __init__(self, interval: float):
+        self.id = uuid.uuid4().hex[:16]
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.layers: Counter = Counter()
+        self.samples = 0
+
+
+class _Sampler(threading.Thread):
+    def __init__(self, profile: _Profile, loop, task):
+        super().__init__(name=f"profiler-{profile.id}", daemon=True)
+        self.profile = profile
+        self.loop = loop
+        self.task = task
+        self.loop_thread_id = threading.get_ident()
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.profile.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == self.ident:
+                    continue
+                if thread_id == self.loop_thread_id:
+                    if asyncio.current_task(self.loop) is not self.task:
+                        continue
+                elif _thread_profiles.get(thread_id) is not self.profile:
+                    continue
+                self._record(frame)
+
+    def _record(self, frame) -> None:
+        names = []
+        layer = None
+        while frame is not None:
+            code = frame.f_code
+            if layer is None:
+                layer = _layer_of(code)
+            names.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        names.reverse()
+        self.profile.stacks[";".join(names)] += 1
+        self.profile.layers[layer or "other"] += 1
+        self.profile.samples += 1
+
+
+def _marks_thread(endpoint):
+    @functools.wraps(endpoint)
+    def run(*args, **kwargs):
+        profile = _active_profile.get()
+        if profile is None:
+            return endpoint(*args, **kwargs)
+        thread_id = threading.get_ident()
+        _thread_profiles[thread_id] = profile
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            del _thread_profiles[thread_id]
+    run.marks_thread = True
+    return run
+
+
+class ProfiledRoute(APIRoute):
+    """APIRoute whose sync endpoint marks its threadpool thread while a profiled request runs it."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        # include_router rebuilds routes from the already wrapped endpoint
+        if not inspect.iscoroutinefunction(endpoint) and not getattr(endpoint, "marks_thread", False):
+            endpoint = _marks_thread(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _layer_of(code) -> Optional[str]:
+    filename = code.co_filename
+    if filename.startswith(_API_DIR):
+        return "router"
+    if filename.startswith(_CRUD_DIR):
+        return "crud"
+    for layer, fragments in _LAYER_PATHS:
+        if any(fragment in filename for fragment in fragments):
+            return layer
+    if code.co_name in _SERIALIZATION_FUNCTIONS:
+        return "serialization"
+    if any(fragment in filename for fragment in _FRAMEWORK_PATHS):
+        return "framework"
+    return None
+
+
+def _short_path(filename: str) -> str:
+    if filename.startswith(_APP_DIR):
+        return "app" + filename[len(_APP_DIR):]
+    marker = filename.rfind("site-packages/")
+    if marker != -1:
+        return filename[marker + len("site-packages/"):]
+    return filename.rsplit("/", 2)[-1] if "/" in filename else filename
+
+
+def layer_summary(profile: dict) -> dict:
+    total = profile["samples"] or 1
+    return {
+        layer: {"ms": round(count * profile["interval_ms"], 2), "percent": round(100 * count / total, 1)}
+        for layer, count in sorted(profile["layer_samples"].items(), key=lambda item: -item[1])
+    }
+
+
+def collapsed_stacks(profile: dict) -> str:
+    return "\n".join(f"{stack} {count}" for stack, count in profile["stacks"].items()) + "\n"
+
+
+class ProfilingMiddleware:
+    """Profiles admin-flagged requests and a random PROFILE_SAMPLE_PERCENT of all requests."""
+
+    def __init__(self, app, store: ProfileStore = profile_store,
+                 sample_percent: float = PROFILE_SAMPLE_PERCENT, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.app = app
+        self.store = store
+        self.sample_percent = sample_percent
+        self.interval = interval_ms / 1000
+
+    def _should_profile(self, scope) -> bool:
+        headers = dict(scope["headers"])
+        requested = headers.get(PROFILE_HEADER) == b"1" or parse_qs(
+            scope.get("query_string", b"").decode("latin-1")
+        ).get("profile") == ["1"]
+        if requested and is_admin_token(headers.get(ADMIN_TOKEN_HEADER, b"").decode("latin-1")):
+            return True
+        return self.sample_percent > 0 and random.random() * 100 < self.sample_percent
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = _Profile(self.interval)
+        token = _active_profile.set(profile)
+        status_code = None
+
+        async def send_with_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message = {**message, "headers": list(message.get("headers", [])) + [
+                    (PROFILE_ID_HEADER, profile.id.encode())
+                ]}
+            await send(message)
+
+        sampler = _Sampler(profile, asyncio.get_running_loop(), asyncio.current_task())
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            sampler.stop()
+            _active_profile.reset(token)
+            duration_ms = round((time.perf_counter() - started) * 1000, 2)
+            record = {
+                "id": profile.id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status_code": status_code,
+                "started_at": time.time() - duration_ms / 1000,
+                "duration_ms": duration_ms,
+                "interval_ms": profile.interval * 1000,
+                "samples": profile.samples,
+                "layer_samples": dict(profile.layers),
+                "stacks": dict(profile.stacks),
+            }
+            self.store.add(record)
+            logger.info(f"Profiled {scope['method']} {scope['path']} in {duration_ms} ms ({profile.samples} samples): {profile.id}")
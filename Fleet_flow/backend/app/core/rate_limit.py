@@ -0,0 +1,221 @@
+"""Rate limiting and load shedding for DB-bound routes.
+
+Requests are sorted into route classes:
+
+- ``writes``: POST/PUT/PATCH/DELETE (driver and dispatcher actions)
+- ``reads``: list/detail GETs
+- ``analytics``: /analytics/*
+- ``exports``: bulk import/export routes
+
+``RateLimitMiddleware`` keeps a token bucket per (client, route class) and
+answers ``429`` + ``Retry-After`` when a bucket is empty.
+
+``LoadShedMiddleware`` caps in-flight DB-bound requests per worker at roughly
+the connection pool capacity and answers ``503`` + ``Retry-After`` beyond it,
+so requests fail fast instead of piling up waiting for a connection. A share of
+the slots is reserved for writes, and analytics/exports are capped at half of
+the rest, so dashboards can never crowd out drivers.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.core.asgi import send_json
+from app.core.config import (
+    LOAD_SHED_FACTOR,
+    LOAD_SHED_WRITE_RESERVE,
+    RATE_LIMIT_ANALYTICS,
+    RATE_LIMIT_EXPORTS,
+    RATE_LIMIT_MAX_CLIENTS,
+    RATE_LIMIT_READS,
+    RATE_LIMIT_WRITES,
+)
+
+logger = logging.getLogger(__name__)
+
+READS = "reads"
+WRITES = "writes"
+ANALYTICS = "analytics"
+EXPORTS = "exports"
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# Routes that never touch the database
+EXEMPT_PATHS = ("/health", "/docs", "/redoc", "/openapi.json")
+ANALYTICS_PREFIXES = ("/analytics",)
+EXPORT_PREFIXES = ("/import", "/export")
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    """Return the route class of a request, or None if it is not DB-bound."""
+    if method == "OPTIONS" or path == "/" or path.startswith(EXEMPT_PATHS):
+        return None
+    if path.startswith(EXPORT_PREFIXES) and (method in WRITE_METHODS or path.startswith("/export")):
+        # Bulk uploads and downloads; polling an import job's progress is a plain read
+        return EXPORTS
+    if path.startswith(ANALYTICS_PREFIXES):
+        return ANALYTICS
+    if method in WRITE_METHODS:
+        return WRITES
+    return READS
+
+
+def client_id(scope) -> str:
+    # uvicorn resolves X-Forwarded-For into scope["client"] when proxy_headers is on
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def parse_rate(value: str) -> tuple[float, float]:
+    """Parse "<requests per second>/<burst>" into (rate, burst)."""
+    rate, _, burst = value.partition("/")
+    rate = float(rate)
+    return rate, float(burst) if burst else max(rate, 1.0)
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated_at")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def take(self) -> float:
+        """Consume one token. Returns 0 on success, else seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        if self.rate <= 0:
+            return 60.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Token buckets per (client, route class), bounded by an LRU of clients."""
+
+    def __init__(self, limits: Optional[dict] = None, max_buckets: int = RATE_LIMIT_MAX_CLIENTS):
+        self.limits = limits or {
+            READS: parse_rate(RATE_LIMIT_READS),
+            WRITES: parse_rate(RATE_LIMIT_WRITES),
+            ANALYTICS: parse_rate(RATE_LIMIT_ANALYTICS),
+            EXPORTS: parse_rate(RATE_LIMIT_EXPORTS),
+        }
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[tuple, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, client: str, route_class: str) -> float:
+        """Returns 0 if the request may proceed, else the Retry-After in seconds."""
+        key = (client, route_class)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(*self.limits[route_class])
+                if len(self._buckets) > self.max_buckets:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            return bucket.take()
+
+
+class ConcurrencyLimiter:
+    """In-flight request slots per route class with a write-priority reserve."""
+
+    def __init__(self, capacity: int, write_reserve: float = LOAD_SHED_WRITE_RESERVE):
+        self.capacity = max(1, capacity)
+        reserved = min(self.capacity - 1, math.ceil(self.capacity * write_reserve)) if self.capacity > 1 else 0
+        shared = self.capacity - reserved
+        self.limits = {
+            WRITES: self.capacity,
+            READS: shared,
+            ANALYTICS: max(1, shared // 2),
+            EXPORTS: max(1, shared // 2),
+        }
+        self.in_flight = {route_class: 0 for route_class in self.limits}
+        self.total = 0
+        self.shed = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, route_class: str) -> bool:
+        with self._lock:
+            if route_class == WRITES:
+                allowed = self.total < self.capacity
+            else:
+                # Non-write classes count against the shared slots only
+                others = self.total - self.in_flight[WRITES]
+                allowed = (
+                    self.in_flight[route_class] < self.limits[route_class]
+                    and others < self.limits[READS]
+                    and self.total < self.capacity
+                )
+            if not allowed:
+                self.shed += 1
+                return False
+            self.in_flight[route_class] += 1
+            self.total += 1
+            return True
+
+    def release(self, route_class: str) -> None:
+        with self._lock:
+            self.in_flight[route_class] -= 1
+            self.total -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "limits": dict(self.limits),
+                "in_flight": dict(self.in_flight),
+                "shed": self.shed,
+            }
+
+
+class RateLimitMiddleware:
+    def __init__(self, app, limiter: Optional[RateLimiter] = None):
+        self.app = app
+        self.limiter = limiter or RateLimiter()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            route_class = classify(scope["method"], scope["path"])
+            if route_class is not None:
+                retry_after = self.limiter.check(client_id(scope), route_class)
+                if retry_after:
+                    logger.warning(f"Rate limited {client_id(scope)} on {route_class}: {scope['method']} {scope['path']}")
+                    await send_json(send, 429, {"detail": f"Too many {route_class} requests"},
+                                    headers=[(b"retry-after", str(math.ceil(retry_after)).encode())])
+                    return
+        await self.app(scope, receive, send)
+
+
+class LoadShedMiddleware:
+    def __init__(self, app, limiter: Optional[ConcurrencyLimiter] = None, retry_after: int = 1):
+        self.app = app
+        if limiter is None:
+            from app.core.database import POOL_CAPACITY
+            limiter = ConcurrencyLimiter(int(POOL_CAPACITY * LOAD_SHED_FACTOR))
+        self.limiter = limiter
+        self.retry_after = retry_after
+
+    async def __call__(self, scope, receive, send):
+        route_class = classify(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+        if not self.limiter.acquire(route_class):
+            logger.warning(f"Shedding {route_class} request: {scope['method']} {scope['path']}")
+            await send_json(send, 503, {"detail": "Server is busy, retry shortly"},
+                            headers=[(b"retry-after", str(self.retry_after).encode())])
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release(route_class)
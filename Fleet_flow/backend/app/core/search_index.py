@@ -0,0 +1,208 @@
+"""In-process search index used when the database has no FULLTEXT support.
+
+Documents (vehicles, drivers, trips) are indexed two ways:
+
+- a trigram inverted index over every searchable field, for substring
+  matches of three or more characters;
+- a sorted token list, for prefix matches of one or two characters
+  (bisect over the sorted list behaves like a trie walk).
+
+Each depot has its own index (``search_indexes[depot]``), so a search only
+ever sees that depot's documents. Indexes are loaded once per worker at
+startup (or on a depot's first search) and kept current by the CRUD create
+functions plus a periodic catch-up of rows inserted by other workers.
+"""
+
+import bisect
+import re
+import threading
+from typing import Iterable, Optional
+
+_TOKEN_RE = re.compile(r"[0-9a-z]+")
+
+# Score bands shared with the MySQL search path so results rank the same way
+# on both backends: identifier hits above free-text hits.
+SCORE_EXACT = 3.0
+SCORE_PREFIX = 2.0
+SCORE_WORD_PREFIX = 1.5
+SCORE_SUBSTRING = 1.0
+
+# One- and two-character queries match a prefix of nearly every token, so
+# they score at most this many documents, taken in sorted-token order.
+SHORT_QUERY_CANDIDATES = 200
+
+
+def normalize(value: str) -> str:
+    return " ".join((value or "").lower().split())
+
+
+def _trigrams(value: str) -> set:
+    return {value[i:i + 3] for i in range(len(value) - 2)}
+
+
+class _Document:
+    __slots__ = ("kind", "id", "label", "identifiers", "text")
+
+    def __init__(self, kind: str, id: int, label: str, identifiers: tuple, text: tuple):
+        self.kind = kind
+        self.id = id
+        self.label = label
+        self.identifiers = identifiers
+        self.text = text
+
+    @property
+    def fields(self) -> tuple:
+        return self.identifiers + self.text
+
+
+class SearchIndex:
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.RLock()
+        self._docs: dict[tuple, _Document] = {}
+        self._grams: dict[str, set] = {}
+        self._tokens: dict[str, set] = {}
+        self._sorted_tokens: list[str] = []
+        # Highest primary key loaded per kind, for the catch-up query
+        self.watermarks: dict[str, int] = {}
+        self.refreshed_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._docs.clear()
+            self._grams.clear()
+            self._tokens.clear()
+            self._sorted_tokens.clear()
+            self.watermarks.clear()
+
+    def replace(self, other: "SearchIndex") -> None:
+        """Take over ``other``'s documents and watermarks (a freshly loaded copy)."""
+        with self._lock:
+            self._docs = other._docs
+            self._grams = other._grams
+            self._tokens = other._tokens
+            self._sorted_tokens = other._sorted_tokens
+            self.watermarks = other.watermarks
+
+    def add(self, kind: str, id: int, label: str,
+            identifiers: Iterable[str] = (), text: Iterable[str] = ()) -> None:
+        """
+        Index a document. ``identifiers`` (plates, license numbers) rank by
+        exact/prefix match; ``text`` fields (names, places) rank below them.
+        """
+        if not self.enabled:
+            return
+        key = (kind, id)
+        doc = _Document(kind, id, label,
+                        tuple(normalize(f) for f in identifiers if f),
+                        tuple(normalize(f) for f in text if f))
+        with self._lock:
+            if key in self._docs:
+                self._unindex(key)
+            self._docs[key] = doc
+            for value in doc.fields:
+                for gram in _trigrams(value):
+                    self._grams.setdefault(gram, set()).add(key)
+                for token in _TOKEN_RE.findall(value):
+                    postings = self._tokens.get(token)
+                    if postings is None:
+                        postings = self._tokens[token] = set()
+                        bisect.insort(self._sorted_tokens, token)
+                    postings.add(key)
+
+    def remove(self, kind: str, id: int) -> None:
+        with self._lock:
+            if (kind, id) in self._docs:
+                self._unindex((kind, id))
+
+    def _unindex(self, key: tuple) -> None:
+        doc = self._docs.pop(key)
+        for value in doc.fields:
+            for gram in _trigrams(value):
+                postings = self._grams.get(gram)
+                if postings is not None:
+                    postings.discard(key)
+                    if not postings:
+                        del self._grams[gram]
+            for token in _TOKEN_RE.findall(value):
+                postings = self._tokens.get(token)
+                if postings is not None:
+                    postings.discard(key)
+                    if not postings:
+                        del self._tokens[token]
+                        i = bisect.bisect_left(self._sorted_tokens, token)
+                        if i < len(self._sorted_tokens) and self._sorted_tokens[i] == token:
+                            del self._sorted_tokens[i]
+
+    def search(self, query: str, kinds: Optional[set] = None, limit: int = 20, offset: int = 0) -> list[dict]:
+        """Return up to ``limit`` ranked hits after skipping ``offset``."""
+        q = normalize(query)
+        if not q:
+            return []
+        with self._lock:
+            candidates = self._candidates(q)
+            hits = []
+            for key in candidates:
+                doc = self._docs[key]
+                if kinds and doc.kind not in kinds:
+                    continue
+                score = _score(q, doc)
+                if score:
+                    hits.append((-score, doc.kind, doc.id, doc.label))
+        hits.sort()
+        return [
+            {"kind": kind, "id": id, "label": label, "score": -neg_score}
+            for neg_score, kind, id, label in hits[offset:offset + limit]
+        ]
+
+    def _candidates(self, q: str) -> set:
+        if len(q) >= 3:
+            postings = [self._grams.get(gram) for gram in _trigrams(q)]
+            if not postings or any(p is None for p in postings):
+                return set()
+            postings.sort(key=len)
+            result = set(postings[0])
+            for p in postings[1:]:
+                result &= p
+                if not result:
+                    break
+            return result
+        # Too short for trigrams: union of the tokens starting with q, capped
+        result = set()
+        i = bisect.bisect_left(self._sorted_tokens, q)
+        while i < len(self._sorted_tokens) and self._sorted_tokens[i].startswith(q):
+            result |= self._tokens[self._sorted_tokens[i]]
+            if len(result) >= SHORT_QUERY_CANDIDATES:
+                break
+            i += 1
+        return result
+
+
+def _score(q: str, doc: _Document) -> float:
+    best = 0.0
+    for value in doc.identifiers:
+        if value == q:
+            return SCORE_EXACT
+        if value.startswith(q):
+            best = SCORE_PREFIX
+    if best:
+        return best
+    for value in doc.fields:
+        if value.startswith(q) or any(t.startswith(q) for t in _TOKEN_RE.findall(value)):
+            return SCORE_WORD_PREFIX
+        if q in value:
+            best = SCORE_SUBSTRING
+    return best
+
+
+class SearchIndexes(dict):
+    """Per-depot indexes, created on first access."""
+
+    def __missing__(self, depot: str) -> SearchIndex:
+        return self.setdefault(depot, SearchIndex())
+
+
+search_indexes = SearchIndexes()
@@ -0,0 +1,198 @@
+"""Startup bookkeeping shared by the app, its lifespan handler and the launcher.
+
+Each worker records how long every startup phase took (imports, pool warm-up,
+cache warm-ups) so cold start can be tuned; the breakdown is served from
+``GET /health/startup``.
+"""
+
+import importlib
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Set by app.server once the schema exists, so workers skip create_all.
+SCHEMA_READY_ENV = "FLEETFLOW_SCHEMA_READY"
+
+MODEL_MODULES = (
+    "app.models.vehicle",
+    "app.models.driver",
+    "app.models.trip",
+    "app.models.maintenance",
+    "app.models.expense",
+    "app.models.idempotency",
+    "app.models.import_job",
+    "app.models.compliance_alert",
+    "app.models.telemetry",
+)
+
+
+class StartupTimer:
+    """Records the wall-clock duration of named startup phases."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.ready_at = None
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((time.perf_counter() - start) * 1000, 2)
+
+    def mark_ready(self) -> None:
+        self.ready_at = time.perf_counter()
+        logger.info(f"Worker {os.getpid()} ready in {self.total_ms()} ms: {self.phases}")
+
+    def total_ms(self):
+        if self.ready_at is None:
+            return None
+        return round((self.ready_at - self.started_at) * 1000, 2)
+
+    def as_dict(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "ready": self.ready_at is not None,
+            "total_ms": self.total_ms(),
+            "phases_ms": dict(self.phases),
+        }
+
+
+startup_timer = StartupTimer()
+
+# Named callables run once per worker during lifespan startup (e.g. in-process
+# indexes and caches). Register with register_warmup() at import time; modules
+# imported after startup (deferred routers) have theirs run on registration.
+_warmups: dict[str, Callable[[], None]] = {}
+_warmups_done = False
+
+
+def register_warmup(name: str, func: Callable[[], None]) -> None:
+    _warmups[name] = func
+    if _warmups_done:
+        _run_warmup(name, func)
+
+
+def run_warmups() -> None:
+    global _warmups_done
+
+    for name, func in list(_warmups.items()):
+        _run_warmup(name, func)
+    _warmups_done = True
+
+
+def _run_warmup(name: str, func: Callable[[], None]) -> None:
+    with startup_timer.phase(f"warmup:{name}"):
+        try:
+            func()
+        except Exception as e:
+            # A cold cache is slower, not broken; keep the worker starting.
+            logger.error(f"Warm-up {name} failed: {str(e)}", exc_info=True)
+
+
+class DeferredRouterMiddleware:
+    """
+    Imports rarely used router modules on the worker's first request instead
+    of at startup, and adds their routes to ``target`` before that request is
+    routed. Their timings still show up as ``import:<module>`` phases.
+    """
+
+    def __init__(self, app, target, modules: tuple):
+        self.app = app
+        self.target = target
+        self._pending = tuple(modules)
+        self._lock = threading.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if self._pending and scope["type"] in ("http", "websocket"):
+            self._include_pending()
+        await self.app(scope, receive, send)
+
+    def _include_pending(self) -> None:
+        with self._lock:
+            for module_name in self._pending:
+                with startup_timer.phase(f"import:{module_name}"):
+                    router_module = importlib.import_module(module_name)
+                self.target.include_router(router_module.router)
+            self._pending = ()
+            # Regenerate the OpenAPI schema with the new routes
+            self.target.openapi_schema = None
+
+
+# Named callables run once per worker during lifespan shutdown, before the
+# connection pools are disposed (e.g. flushing write buffers).
+_shutdown_hooks: dict[str, Callable[[], None]] = {}
+
+
+def register_shutdown(name: str, func: Callable[[], None]) -> None:
+    _shutdown_hooks[name] = func
+
+
+def run_shutdown_hooks() -> None:
+    for name, func in _shutdown_hooks.items():
+        try:
+            func()
+        except Exception as e:
+            logger.error(f"Shutdown hook {name} failed: {str(e)}", exc_info=True)
+
+
+def create_schema() -> None:
+    """
+    Import every model module and create missing tables, columns and indexes
+    on the default database and every depot shard.
+    """
+    from app.core.database import Base, all_engines
+
+    for module in MODEL_MODULES:
+        importlib.import_module(module)
+    for engine in all_engines():
+        Base.metadata.create_all(bind=engine)
+        # create_all leaves existing tables alone; add columns and indexes
+        # introduced since they were created.
+        _add_missing_columns(engine, Base.metadata)
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
+
+
+def _add_missing_columns(engine, metadata) -> None:
+    from sqlalchemy import inspect
+    from sqlalchemy.schema import CreateColumn
+
+    inspector = inspect(engine)
+    preparer = engine.dialect.identifier_preparer
+    for table in metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = CreateColumn(column).compile(dialect=engine.dialect)
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {ddl}"))
+            logger.info(f"Added column {table.name}.{column.name}")
+
+
+def schema_ready() -> bool:
+    return os.getenv(SCHEMA_READY_ENV) == "1"
+
+
+def warm_connection_pool(engine, connections: int) -> None:
+    """Open (and return to the pool) ``connections`` connections up front."""
+    opened = []
+    try:
+        for _ in range(connections):
+            conn = engine.connect()
+            conn.execute(text("SELECT 1"))
+            opened.append(conn)
+    finally:
+        for conn in opened:
+            conn.close()
@@ -0,0 +1,102 @@
+"""Depot (tenant) scoping.
+
+Every fleet model mixes in ``DepotScoped`` and so carries an indexed
+``depot_id``. Sessions opened for a depot (``app.core.database.depot_session``,
+which ``get_db`` uses for every request) carry it in ``session.info`` and two
+session events keep them inside it:
+
+- every ORM SELECT, UPDATE and DELETE gets ``depot_id = :depot`` added for
+  each depot-scoped entity, including relationship and eager loads;
+- new objects are stamped with the session's depot when flushed.
+
+CRUD code therefore needs no depot parameter. Sessions without a depot (startup
+loaders, background jobs) see every depot; a query can also opt out with
+``.execution_options(all_depots=True)``. Bulk writes by primary key
+(``session.execute(update(Model), [rows])``) and Core inserts must set/check
+depot_id themselves.
+"""
+
+import re
+from typing import Optional
+
+from fastapi import Header, HTTPException, status
+from sqlalchemy import Column, String, event
+from sqlalchemy.orm import Session, with_loader_criteria
+
+from app.core.config import DEFAULT_DEPOT, DEPOT_DATABASE_URLS, DEPOTS
+
+DEPOT_HEADER = "X-Depot"
+_DEPOT_ID_RE = re.compile(r"^[a-z0-9][a-z0-9_-]{0,49}$")
+
+
+class DepotScoped:
+    """Mixin for models whose rows belong to exactly one depot."""
+
+    depot_id = Column(String(50), nullable=False, default=DEFAULT_DEPOT,
+                      server_default=DEFAULT_DEPOT, index=True)
+
+
+class DepotMismatchError(ValueError):
+    pass
+
+
+class DuplicateKeyError(ValueError):
+    """A natural key (plate, license number) is taken; keys are unique across all depots."""
+
+
+def known_depots() -> list[str]:
+    """Depots named in configuration (data may exist for others when DEPOTS is empty)."""
+    return sorted({DEFAULT_DEPOT, *DEPOTS, *DEPOT_DATABASE_URLS})
+
+
+def resolve_depot(value: Optional[str]) -> str:
+    """Validate a requested depot id: ValueError if malformed, LookupError if not in DEPOTS."""
+    depot = (value or "").strip().lower() or DEFAULT_DEPOT
+    if not _DEPOT_ID_RE.match(depot):
+        raise ValueError(f"Invalid depot id {value!r}")
+    if DEPOTS and depot not in known_depots():
+        raise LookupError(f"Unknown depot {depot!r}")
+    return depot
+
+
+def get_depot(x_depot: Optional[str] = Header(None, alias=DEPOT_HEADER)) -> str:
+    """Dependency resolving the request's depot from the X-Depot header."""
+    try:
+        return resolve_depot(x_depot)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def session_depot(db: Session) -> str:
+    return db.info.get("depot_id") or DEFAULT_DEPOT
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _scope_statement(state) -> None:
+    depot = state.session.info.get("depot_id")
+    if depot is None or state.execution_options.get("all_depots"):
+        return
+    if not (state.is_select or state.is_update or state.is_delete):
+        return
+    if isinstance(state.parameters, list):
+        # executemany bulk UPDATE by primary key takes no extra criteria
+        return
+    state.statement = state.statement.options(
+        with_loader_criteria(DepotScoped, lambda cls: cls.depot_id == depot, include_aliases=True)
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_new_objects(session, flush_context, instances) -> None:
+    depot = session.info.get("depot_id")
+    if depot is None:
+        return
+    for obj in session.new:
+        if not isinstance(obj, DepotScoped):
+            continue
+        if obj.depot_id is None:
+            obj.depot_id = depot
+        elif obj.depot_id != depot:
+            raise DepotMismatchError(f"Cannot write a {obj.depot_id!r} row from a {depot!r} session")
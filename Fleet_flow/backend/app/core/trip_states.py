@@ -0,0 +1,86 @@
+"""Trip lifecycle state machine.
+
+    Draft ──dispatch──▶ Dispatched ──complete──▶ Completed
+      │                     │
+      └──cancel──▶ Cancelled ◀──cancel──┘
+
+Dispatching claims the trip's vehicle and driver (both move to "On Trip");
+completing or cancelling a dispatched trip releases them again. Each
+transition is applied by app.crud.trip.transition_trip as conditional
+``UPDATE ... WHERE status IN (...)`` statements inside one transaction.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+DRAFT = "Draft"
+DISPATCHED = "Dispatched"
+COMPLETED = "Completed"
+CANCELLED = "Cancelled"
+
+TRIP_STATES = (DRAFT, DISPATCHED, COMPLETED, CANCELLED)
+
+# Status strings written before the state machine existed (the old dispatcher
+# form offered Pending / In Progress / Completed / Cancelled) map onto the
+# canonical states.
+LEGACY_ALIASES = {
+    "Pending": DRAFT,
+    "Scheduled": DRAFT,
+    "In Progress": DISPATCHED,
+    "In Transit": DISPATCHED,
+    "Delivered": COMPLETED,
+}
+
+VEHICLE_ON_TRIP = "On Trip"
+VEHICLE_AVAILABLE = "Available"
+VEHICLE_AVAILABLE_STATES = (VEHICLE_AVAILABLE, "Active")
+
+DRIVER_ON_TRIP = "On Trip"
+DRIVER_ON_DUTY = "On Duty"
+DRIVER_AVAILABLE_STATES = (DRIVER_ON_DUTY, "Active", "Available")
+
+
+class TripNotFoundError(ValueError):
+    pass
+
+
+class TripTransitionError(ValueError):
+    """The transition is not allowed from the trip's current state, or lost a race."""
+
+
+@dataclass(frozen=True)
+class Transition:
+    source: str
+    target: str
+    claim_resources: bool = False  # vehicle/driver -> On Trip (must be available)
+    release_resources: bool = False  # vehicle/driver back to available (best effort)
+
+
+TRANSITIONS = {
+    (DRAFT, DISPATCHED): Transition(DRAFT, DISPATCHED, claim_resources=True),
+    (DRAFT, CANCELLED): Transition(DRAFT, CANCELLED),
+    (DISPATCHED, COMPLETED): Transition(DISPATCHED, COMPLETED, release_resources=True),
+    (DISPATCHED, CANCELLED): Transition(DISPATCHED, CANCELLED, release_resources=True),
+}
+
+
+def canonical_state(status: Optional[str]) -> Optional[str]:
+    if status in TRIP_STATES:
+        return status
+    return LEGACY_ALIASES.get(status)
+
+
+def stored_values(state: str) -> tuple:
+    """Every status string that may be stored for ``state``."""
+    return (state,) + tuple(alias for alias, target in LEGACY_ALIASES.items() if target == state)
+
+
+def get_transition(source: Optional[str], target: str) -> Transition:
+    transition = TRANSITIONS.get((canonical_state(source), target))
+    if transition is None:
+        allowed = sorted(t for (s, t) in TRANSITIONS if s == canonical_state(source))
+        raise TripTransitionError(
+            f"Cannot move trip from {source!r} to {target!r}"
+            + (f"; allowed: {', '.join(allowed)}" if allowed else "; trip is in a final state")
+        )
+    return transition
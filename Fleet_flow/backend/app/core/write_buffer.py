@@ -0,0 +1,168 @@
+"""Bounded in-process write buffer with group commit.
+
+Request handlers ``offer()`` rows and return immediately; one flusher thread
+per worker drains the buffer and hands each batch to a flush function, which
+writes it in a single transaction. A batch is flushed as soon as
+``flush_size`` rows are waiting, or ``flush_interval`` after its oldest row
+arrived, whichever comes first - so under load every commit carries many rows
+and at low rates no row waits longer than the interval.
+
+When ``capacity`` rows are already waiting, ``offer()`` refuses the whole
+batch and the caller answers 503 + Retry-After: the database sets the pace and
+memory stays bounded instead of growing until the worker dies.
+
+Rows are grouped by a partition key (the depot) because each partition may
+live in a different database.
+
+A flush that fails with a transient error (``is_transient``: deadlock, lost
+connection) is retried up to ``retries`` times with exponential backoff; if it
+still fails the rows go back to the front of the buffer, so an outage fills
+the buffer (and turns into 503s) instead of losing data. Any other error
+would fail again on retry: those rows are dropped and counted.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBuffer:
+    def __init__(self, name: str, flush: Callable[[Hashable, list], None],
+                 capacity: int, flush_size: int, flush_interval: float,
+                 is_transient: Optional[Callable[[Exception], bool]] = None,
+                 retries: int = 3, retry_backoff: float = 0.1):
+        self.name = name
+        self._flush = flush
+        self._is_transient = is_transient or (lambda error: False)
+        self.retries = max(0, retries)
+        self.retry_backoff = retry_backoff
+        self.capacity = capacity
+        self.flush_size = max(1, flush_size)
+        self.flush_interval = flush_interval
+        self._rows: deque = deque()  # (partition, row, arrived_at)
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self.accepted = 0
+        self.rejected = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.retried = 0
+        self.requeued = 0
+        self.flushes = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def offer(self, partition: Hashable, rows: list) -> bool:
+        """Queue ``rows`` for ``partition``; False (nothing queued) if they don't fit."""
+        with self._cond:
+            if len(self._rows) + len(rows) > self.capacity or self._stopping:
+                self.rejected += len(rows)
+                return False
+            was_empty = not self._rows
+            arrived_at = time.monotonic()
+            self._rows.extend((partition, row, arrived_at) for row in rows)
+            self.accepted += len(rows)
+            # Wake the flusher to start the interval timer or flush a full batch
+            if was_empty or len(self._rows) >= self.flush_size:
+                self._cond.notify()
+            return True
+
+    def start(self) -> None:
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name=f"{self.name}-flusher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Refuse new rows, flush everything waiting (no requeue) and stop the flusher thread."""
+        with self._cond:
+            self._stopping = True
+            thread, self._thread = self._thread, None
+            self._cond.notify()
+        if thread is not None:
+            thread.join()
+        while self._rows:
+            self._flush_batch(self._take(), requeue=False)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "buffered": len(self._rows),
+                "capacity": self.capacity,
+                "accepted": self.accepted,
+                "rejected": self.rejected,
+                "flushed": self.flushed,
+                "dropped": self.dropped,
+                "retried": self.retried,
+                "requeued": self.requeued,
+                "flushes": self.flushes,
+            }
+
+    def _take(self) -> list:
+        with self._cond:
+            count = min(len(self._rows), self.flush_size)
+            return [self._rows.popleft() for _ in range(count)]
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopping:
+                    if len(self._rows) >= self.flush_size:
+                        break
+                    if self._rows:
+                        # Rows left over from a full batch keep their own arrival time
+                        remaining = self._rows[0][2] + self.flush_interval - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    else:
+                        self._cond.wait()
+                if self._stopping:
+                    return
+            self._flush_batch(self._take())
+
+    def _flush_batch(self, batch: list, requeue: bool = True) -> None:
+        partitions: dict = {}
+        for entry in batch:
+            partitions.setdefault(entry[0], []).append(entry)
+        requeued = []
+        for partition, entries in partitions.items():
+            rows = [row for _, row, _ in entries]
+            error = self._flush_with_retries(partition, rows)
+            if error is None:
+                self.flushed += len(rows)
+            elif requeue and self._is_transient(error):
+                requeued.extend(entries)
+                logger.error(f"{self.name}: requeued {len(rows)} rows for {partition} after "
+                             f"{self.retries} retries: {str(error)}")
+            else:
+                self.dropped += len(rows)
+                logger.error(f"{self.name}: dropped {len(rows)} rows for {partition}: {str(error)}",
+                             exc_info=error)
+        if requeued:
+            # Back in front with their arrival times, ahead of newer rows
+            with self._cond:
+                self._rows.extendleft(reversed(requeued))
+                self.requeued += len(requeued)
+        self.flushes += 1
+
+    def _flush_with_retries(self, partition: Hashable, rows: list) -> Optional[Exception]:
+        """Flush one partition, retrying transient errors; returns the last error, or None."""
+        for attempt in range(self.retries + 1):
+            try:
+                self._flush(partition, rows)
+                return None
+            except Exception as e:
+                if attempt == self.retries or not self._is_transient(e):
+                    return e
+                self.retried += 1
+                logger.warning(f"{self.name}: flush for {partition} failed ({str(e)}), retrying")
+                time.sleep(self.retry_backoff * 2 ** attempt)
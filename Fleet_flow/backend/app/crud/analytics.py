@@ -0,0 +1,145 @@
+import logging
+import threading
+import time
+
+from sqlalchemy import Float, String, cast, func, literal, null, select, union_all
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import DASHBOARD_CACHE_SECONDS
+from app.core.tenancy import session_depot
+from app.core.trip_states import (
+    DISPATCHED,
+    DRIVER_ON_DUTY,
+    TRIP_STATES,
+    VEHICLE_AVAILABLE_STATES,
+    VEHICLE_ON_TRIP,
+    canonical_state,
+)
+from app.models.driver import Driver
+from app.models.expense import Expense
+from app.models.maintenance import Maintenance
+from app.models.trip import Trip
+from app.models.vehicle import Vehicle
+
+logger = logging.getLogger(__name__)
+
+MAINTENANCE_CLOSED_STATES = ("Completed", "Closed", "Resolved")
+VEHICLE_IN_SHOP_STATES = ("Maintenance", "In Shop")
+
+# depot -> (computed_at, summary)
+_dashboard_cache: dict[str, tuple] = {}
+_dashboard_lock = threading.Lock()
+
+
+def _grouped(kind: str, model, amount=None):
+    return (
+        select(
+            literal(kind, String).label("kind"),
+            cast(model.status, String).label("status"),
+            func.count().label("count"),
+            cast(func.sum(amount) if amount is not None else null(), Float).label("amount"),
+            cast(null(), Float).label("amount2"),
+        )
+        .group_by(model.status)
+    )
+
+
+def _dashboard_query():
+    # One round trip: per-status counts for each table plus the cost sums,
+    # stacked with UNION ALL. Depot scoping reaches into every branch.
+    expenses = select(
+        literal("expense", String),
+        cast(null(), String),
+        func.count(),
+        cast(func.sum(Expense.fuel_cost), Float),
+        cast(func.sum(Expense.misc_cost), Float),
+    )
+    return select(union_all(
+        _grouped("vehicle", Vehicle),
+        _grouped("driver", Driver),
+        _grouped("trip", Trip),
+        _grouped("maintenance", Maintenance, Maintenance.cost),
+        expenses,
+    ).subquery())
+
+
+def _summarize(rows) -> dict:
+    by_status = {"vehicle": {}, "driver": {}, "trip": {}, "maintenance": {}}
+    maintenance_cost = 0.0
+    maintenance_open = 0
+    fuel_cost = misc_cost = 0.0
+    for kind, status, count, amount, amount2 in rows:
+        if kind == "expense":
+            fuel_cost, misc_cost = amount or 0.0, amount2 or 0.0
+            continue
+        if kind == "trip":
+            # Fold legacy status strings into the state machine's states
+            status = canonical_state(status) or status
+        status = status or "Unknown"
+        by_status[kind][status] = by_status[kind].get(status, 0) + count
+        if kind == "maintenance":
+            maintenance_cost += amount or 0.0
+            if status not in MAINTENANCE_CLOSED_STATES:
+                maintenance_open += count
+
+    vehicles, drivers, trips, maintenance = (
+        by_status["vehicle"], by_status["driver"], by_status["trip"], by_status["maintenance"]
+    )
+    return {
+        "vehicles": {
+            "total": sum(vehicles.values()),
+            "available": sum(vehicles.get(s, 0) for s in VEHICLE_AVAILABLE_STATES),
+            "on_trip": vehicles.get(VEHICLE_ON_TRIP, 0),
+            "in_shop": sum(vehicles.get(s, 0) for s in VEHICLE_IN_SHOP_STATES),
+            "by_status": vehicles,
+        },
+        "drivers": {
+            "total": sum(drivers.values()),
+            "on_duty": drivers.get(DRIVER_ON_DUTY, 0),
+            "by_status": drivers,
+        },
+        "trips": {
+            "total": sum(trips.values()),
+            "active": trips.get(DISPATCHED, 0),
+            "by_status": {**{state: 0 for state in TRIP_STATES}, **trips},
+        },
+        "maintenance": {
+            "total": sum(maintenance.values()),
+            "open": maintenance_open,
+            "by_status": maintenance,
+        },
+        "costs": {
+            "fuel": round(fuel_cost, 2),
+            "misc": round(misc_cost, 2),
+            "maintenance": round(maintenance_cost, 2),
+            "total": round(fuel_cost + misc_cost + maintenance_cost, 2),
+        },
+    }
+
+
+def get_dashboard(db: Session) -> dict:
+    """
+    Fleet summary for the session's depot: counts by status for vehicles,
+    drivers, trips and maintenance, plus cost totals, from a single grouped
+    query. Results are reused for DASHBOARD_CACHE_SECONDS per depot.
+
+    Raises:
+        ValueError: For database errors
+    """
+    depot = session_depot(db)
+    now = time.monotonic()
+    with _dashboard_lock:
+        cached = _dashboard_cache.get(depot)
+    if cached is not None and now - cached[0] < DASHBOARD_CACHE_SECONDS:
+        return cached[1]
+    try:
+        rows = db.execute(_dashboard_query()).all()
+    except SQLAlchemyError as e:
+        logger.error(f"Database error computing dashboard: {str(e)}")
+        raise ValueError(f"Database error: {str(e)}")
+    summary = {"depot_id": depot, **_summarize(rows)}
+    if DASHBOARD_CACHE_SECONDS > 0:
+        with _dashboard_lock:
+            _dashboard_cache[depot] = (now, summary)
+    return summary
@@ -0,0 +1,211 @@
+import logging
+import threading
+import time
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.compliance import (
+    DRIVER_LICENSE,
+    Alert,
+    Deadline,
+    deadline_heaps,
+    notify,
+    parse_due_date,
+    pending_alerts,
+)
+from app.core.config import COMPLIANCE_CHECK_SECONDS, COMPLIANCE_RELOAD_SECONDS
+from app.core.startup import register_warmup
+from app.core.tenancy import session_depot
+from app.models.compliance_alert import ComplianceAlert
+from app.models.driver import Driver
+
+logger = logging.getLogger(__name__)
+
+_DRIVER_COLUMNS = (Driver.id, Driver.name, Driver.license_number, Driver.expiry_date)
+
+# Alerts this worker has already recorded; saves a failing INSERT per check.
+# Pruned to the alerts still pending, so it stays as small as the heaps.
+_fired: set[tuple] = set()
+# Set once load_deadlines() succeeded; the checker retries until then
+_loaded = False
+
+
+# ----------------------------------------
+# Heap maintenance
+# ----------------------------------------
+
+def _driver_deadline(id, name, license_number, expiry_date) -> Optional[Deadline]:
+    due = parse_due_date(expiry_date)
+    if due is None:
+        return None
+    return Deadline(DRIVER_LICENSE, id, due, f"{name} ({license_number})",
+                    details={"name": name, "license_number": license_number})
+
+def _track(depot: str, id, name, license_number, expiry_date) -> None:
+    deadline = _driver_deadline(id, name, license_number, expiry_date)
+    if deadline is None:
+        deadline_heaps[depot].discard(DRIVER_LICENSE, id)
+    else:
+        deadline_heaps[depot].upsert(deadline)
+
+def track_driver(driver: Driver) -> None:
+    """Add, move or drop a driver's license deadline after a create/update."""
+    _track(driver.depot_id, driver.id, driver.name, driver.license_number, driver.expiry_date)
+
+def track_drivers(db: Session, license_numbers: list) -> None:
+    """Re-read the given drivers (e.g. one import chunk) and update their deadlines."""
+    depot = session_depot(db)
+    for row in db.query(*_DRIVER_COLUMNS).filter(Driver.license_number.in_(license_numbers)):
+        _track(depot, *row)
+
+
+def load_deadlines() -> None:
+    """Rebuild every depot's heap from the default database and all shards."""
+    global _loaded
+
+    from app.core.database import SessionLocal, all_engines
+
+    by_depot: dict[str, list] = {}
+    skipped = 0
+    for engine in all_engines():
+        db = SessionLocal(bind=engine)
+        try:
+            for row in db.query(Driver.depot_id, *_DRIVER_COLUMNS).yield_per(5000):
+                deadline = _driver_deadline(*row[1:])
+                if deadline is None:
+                    skipped += 1
+                else:
+                    by_depot.setdefault(row.depot_id, []).append(deadline)
+        finally:
+            db.close()
+    for depot in set(by_depot) | set(deadline_heaps):
+        deadline_heaps[depot].replace_all(by_depot.get(depot, ()))
+    _loaded = True
+    if skipped:
+        logger.warning(f"Compliance: {skipped} drivers have no parseable expiry_date")
+    logger.info(f"Compliance deadlines loaded: {sum(len(d) for d in by_depot.values())} in {len(by_depot)} depots")
+
+
+# ----------------------------------------
+# Alerts
+# ----------------------------------------
+
+def check_alerts(today: Optional[date] = None) -> list[Alert]:
+    """
+    Fire every alert that has come due and was not fired before, in every depot.
+
+    Each alert is recorded in its depot's compliance_alerts table before it is
+    sent; the unique constraint makes exactly one worker (across restarts,
+    too) deliver it.
+    """
+    from app.core.database import depot_session
+
+    today = today or date.today()
+    fired = []
+    pending = set()
+    for depot, heap in list(deadline_heaps.items()):
+        alerts = []
+        for alert in pending_alerts(depot, heap, today):
+            key = (depot, alert.kind, alert.entity_id, alert.due_date, alert.threshold_days)
+            pending.add(key)
+            if key not in _fired:
+                alerts.append(alert)
+        if not alerts:
+            continue
+        db = depot_session(depot)
+        try:
+            for alert in alerts:
+                key = (depot, alert.kind, alert.entity_id, alert.due_date, alert.threshold_days)
+                try:
+                    db.add(ComplianceAlert(kind=alert.kind, entity_id=alert.entity_id,
+                                           due_date=alert.due_date, threshold_days=alert.threshold_days))
+                    db.commit()
+                except IntegrityError:
+                    db.rollback()
+                    _fired.add(key)
+                    continue
+                _fired.add(key)
+                notify(alert)
+                fired.append(alert)
+        finally:
+            db.close()
+    # Alerts no longer pending (driver renewed or removed, next threshold
+    # reached) will not come up again as the same key.
+    _fired.intersection_update(pending)
+    return fired
+
+
+class _ComplianceChecker(threading.Thread):
+    """
+    Per-worker loop: check alerts right away and then every
+    COMPLIANCE_CHECK_SECONDS, reload the heap every COMPLIANCE_RELOAD_SECONDS -
+    and on every tick until a load has succeeded, so a database that isn't up
+    at boot only delays alerts.
+    """
+
+    def __init__(self):
+        super().__init__(name="compliance-checker", daemon=True)
+
+    def run(self) -> None:
+        since_reload = 0.0
+        while True:
+            try:
+                if since_reload >= COMPLIANCE_RELOAD_SECONDS or not _loaded:
+                    since_reload = 0.0
+                    load_deadlines()
+                check_alerts()
+            except Exception as e:
+                # Keep the loop alive whatever failed; the next tick retries.
+                logger.error(f"Compliance check failed: {str(e)}", exc_info=True)
+            time.sleep(COMPLIANCE_CHECK_SECONDS)
+            since_reload += COMPLIANCE_CHECK_SECONDS
+
+
+_checker: Optional[_ComplianceChecker] = None
+
+
+def start_compliance() -> None:
+    """
+    Load the heaps, then start the checker, which sends the first alerts off
+    the startup path (writing and delivering them can take a while).
+    """
+    global _checker
+
+    try:
+        load_deadlines()
+    finally:
+        # Started even if the load failed: the warm-up error is logged and
+        # the checker keeps retrying the load.
+        if _checker is None and COMPLIANCE_CHECK_SECONDS > 0:
+            _checker = _ComplianceChecker()
+            _checker.start()
+
+register_warmup("compliance", start_compliance)
+
+
+# ----------------------------------------
+# Queries
+# ----------------------------------------
+
+def get_expiring_drivers(depot: str, within_days: int, include_expired: bool = True,
+                         today: Optional[date] = None) -> list[dict]:
+    """Drivers of ``depot`` whose license expires within ``within_days``, soonest first, served from the heap."""
+    today = today or date.today()
+    deadlines = deadline_heaps[depot].due_within(
+        today + timedelta(days=within_days),
+        kinds=(DRIVER_LICENSE,),
+        since=None if include_expired else today,
+    )
+    return [
+        {
+            "driver_id": d.entity_id,
+            "name": d.details["name"],
+            "license_number": d.details["license_number"],
+            "expiry_date": d.due,
+            "days_left": (d.due - today).days,
+        }
+        for d in deadlines
+    ]
@@ -1,12 +1,31 @@
+import logging
+
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from app.core.tenancy import DuplicateKeyError
 from app.models.driver import Driver
+from app.crud.compliance import track_driver
+from app.crud.search import index_driver
 from app.schemas.driver import DriverCreate
 
+logger = logging.getLogger(__name__)
+
 def create_driver(db: Session, driver: DriverCreate):
+    """
+    Raises:
+        DuplicateKeyError: If the license number is already registered (in any depot)
+    """
     db_driver = Driver(**driver.dict())
     db.add(db_driver)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        logger.warning(f"Integrity error creating driver {driver.license_number!r}: {str(e)}")
+        raise DuplicateKeyError(f"Driver with license number {driver.license_number!r} already exists")
     db.refresh(db_driver)
+    index_driver(db_driver)
+    track_driver(db_driver)
     return db_driver
 
 def get_drivers(db: Session):
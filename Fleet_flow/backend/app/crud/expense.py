@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from app.models.expense import Expense
 from app.models.trip import Trip
+from app.crud.lanes import record_expense
 from app.schemas.expense import ExpenseCreate
 import logging
 
@@ -27,6 +28,7 @@ def create_expense(db: Session, expense: ExpenseCreate):
         db.add(db_item)
         db.commit()
         db.refresh(db_item)
+        record_expense(db_item)
         logger.info(f"Expense created: id={db_item.id}, trip_id={expense.trip_id}")
         return db_item
         
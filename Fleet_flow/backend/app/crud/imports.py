@@ -0,0 +1,285 @@
+import csv
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from typing import BinaryIO, Callable, Optional
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import func, insert, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import IMPORT_CHUNK_SIZE, IMPORT_MAX_ERRORS, IMPORT_WORKERS
+from app.core.startup import register_shutdown
+from app.core.tenancy import session_depot
+from app.crud.compliance import track_drivers
+from app.crud.search import index_driver, index_vehicle
+from app.models.driver import Driver
+from app.models.import_job import ImportJob
+from app.models.vehicle import Vehicle
+from app.schemas.driver import DriverCreate
+from app.schemas.vehicle import VehicleCreate
+
+logger = logging.getLogger(__name__)
+
+_COPY_BUFFER = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ImportSpec:
+    model: type
+    schema: type[BaseModel]
+    key: str  # natural key used to dedupe against existing rows
+    # Called with (db, keys) after each committed chunk to refresh in-process state
+    after_write: Optional[Callable[[Session, list], None]] = None
+
+
+def _after_vehicle_write(db: Session, plates: list) -> None:
+    for vehicle in db.query(Vehicle).filter(Vehicle.plate.in_(plates)):
+        index_vehicle(vehicle)
+
+def _after_driver_write(db: Session, license_numbers: list) -> None:
+    track_drivers(db, license_numbers)
+    for driver in db.query(Driver).filter(Driver.license_number.in_(license_numbers)):
+        index_driver(driver)
+
+
+IMPORT_SPECS = {
+    "vehicles": ImportSpec(Vehicle, VehicleCreate, "plate", after_write=_after_vehicle_write),
+    "drivers": ImportSpec(Driver, DriverCreate, "license_number", after_write=_after_driver_write),
+}
+
+
+# ----------------------------------------
+# Job bookkeeping
+# ----------------------------------------
+
+def create_import_job(db: Session, kind: str, filename: str, on_conflict: str) -> ImportJob:
+    job = ImportJob(
+        id=uuid.uuid4().hex,
+        kind=kind,
+        filename=(filename or "")[:255],
+        on_conflict=on_conflict,
+        status="Queued",
+        rows_processed=0, inserted=0, updated=0, skipped=0, failed=0,
+        errors="[]",
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+def get_import_job(db: Session, job_id: str):
+    return db.query(ImportJob).filter(ImportJob.id == job_id).first()
+
+def spool_upload(source: BinaryIO) -> str:
+    """Copy an upload to a private temp file in fixed-size blocks; returns its path."""
+    fd, path = tempfile.mkstemp(prefix="fleetflow-import-", suffix=".csv")
+    with os.fdopen(fd, "wb") as target:
+        shutil.copyfileobj(source, target, _COPY_BUFFER)
+    return path
+
+
+# ----------------------------------------
+# Import pipeline
+# ----------------------------------------
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def submit_import(job_id: str, path: str, depot: str) -> None:
+    """
+    Queue an import on this worker's import pool (IMPORT_WORKERS threads).
+
+    Imports run outside the request: they hold no load-shedding slot and no
+    AnyIO threadpool thread, and the upload request returns as soon as the
+    job is queued.
+    """
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=IMPORT_WORKERS, thread_name_prefix="import")
+    _executor.submit(run_import, job_id, path, depot)
+
+
+def stop_imports() -> None:
+    # Jobs still queued stay "Queued"; running ones finish their current chunk
+    # only if the process lives long enough.
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+
+register_shutdown("imports", stop_imports)
+
+
+def run_import(job_id: str, path: str, depot: str) -> None:
+    """
+    Stream a CSV file into the depot's table in chunks of IMPORT_CHUNK_SIZE rows.
+
+    Each chunk is validated row by row against the Create schema, deduped
+    against existing rows with one ``WHERE key IN (...)`` lookup, then
+    written with one multi-row INSERT and one executemany UPDATE, committed
+    together with the job's progress counters. Keys already used by another
+    depot are reported as failed rows. Runs on the import pool
+    (submit_import) with its own depot-scoped session.
+    """
+    from app.core.database import depot_session
+
+    db = depot_session(depot)
+    try:
+        job = get_import_job(db, job_id)
+        spec = IMPORT_SPECS[job.kind]
+        job.status = "Running"
+        db.commit()
+        errors = []
+
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            missing = set(spec.schema.model_fields) - set(reader.fieldnames or [])
+            if missing:
+                raise ValueError(f"CSV is missing required columns: {', '.join(sorted(missing))}")
+
+            # Row numbers are 1-based and count the header line, as in a spreadsheet
+            row_number = 1
+            while True:
+                chunk = list(islice(reader, IMPORT_CHUNK_SIZE))
+                if not chunk:
+                    break
+                valid = {}
+                row_numbers = {}
+                failed = duplicates = 0
+                for raw in chunk:
+                    row_number += 1
+                    try:
+                        record = spec.schema(**{field: raw.get(field) for field in spec.schema.model_fields})
+                    except ValidationError as e:
+                        failed += 1
+                        _record_error(errors, row_number, _format_validation_error(e))
+                        continue
+                    data = record.model_dump()
+                    data[spec.key] = data[spec.key].strip()
+                    key = _normalize_key(data[spec.key])
+                    if key in valid:
+                        # Same key twice in the file: the later row wins
+                        duplicates += 1
+                    valid[key] = data
+                    row_numbers[key] = row_number
+
+                # Counters are applied after the write: a retried chunk rolls
+                # back and reloads the job row.
+                inserted, updated, skipped, foreign = _write_chunk(db, spec, valid, job.on_conflict)
+                for key, other_depot in foreign.items():
+                    _record_error(errors, row_numbers[key],
+                                  f"{spec.key} {valid[key][spec.key]!r} belongs to depot {other_depot!r}")
+                job.inserted += inserted
+                job.updated += updated
+                job.skipped += skipped + duplicates
+                job.failed += failed + len(foreign)
+                job.rows_processed += len(chunk)
+                job.errors = json.dumps(errors)
+                db.commit()
+                if spec.after_write and valid:
+                    spec.after_write(db, [data[spec.key] for data in valid.values()])
+
+        job.status = "Completed"
+        job.finished_at = datetime.utcnow()
+        db.commit()
+        logger.info(
+            f"Import {job_id} completed: {job.rows_processed} rows, {job.inserted} inserted, "
+            f"{job.updated} updated, {job.skipped} skipped, {job.failed} failed"
+        )
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Import {job_id} failed: {str(e)}", exc_info=True)
+        job = get_import_job(db, job_id)
+        if job is not None:
+            job.status = "Failed"
+            job.finished_at = datetime.utcnow()
+            errors = json.loads(job.errors or "[]")
+            _record_error(errors, None, str(e))
+            job.errors = json.dumps(errors)
+            db.commit()
+    finally:
+        db.close()
+        os.unlink(path)
+
+
+def _normalize_key(value) -> str:
+    # Plates and license numbers are unique under MySQL's case-insensitive
+    # collation, so "abc1" in a file is the stored "ABC1".
+    return str(value).strip().casefold()
+
+
+def _write_chunk(db: Session, spec: ImportSpec, rows: dict, on_conflict: str, retries: int = 1):
+    """
+    Upsert one validated chunk into the session's depot.
+
+    ``rows`` is keyed by the normalized natural key (_normalize_key). Returns
+    (inserted, updated, skipped, foreign), where ``foreign`` maps normalized
+    keys that already belong to another depot (natural keys are unique
+    across depots) to that depot; those rows are left alone.
+    """
+    if not rows:
+        return 0, 0, 0, {}
+    depot = session_depot(db)
+    key_column = getattr(spec.model, spec.key)
+    try:
+        existing = {}
+        foreign = {}
+        if db.get_bind().dialect.name == "mysql":
+            # The column's case-insensitive collation does the folding and keeps the unique index usable
+            matches = key_column.in_([data[spec.key] for data in rows.values()])
+        else:
+            matches = func.lower(key_column).in_(list(rows))
+        lookup = (
+            db.query(key_column, spec.model.id, spec.model.depot_id)
+            .filter(matches)
+            .execution_options(all_depots=True)
+        )
+        for key, id, row_depot in lookup:
+            key = _normalize_key(key)
+            if key not in rows:
+                continue
+            if row_depot == depot:
+                existing[key] = id
+            else:
+                foreign[key] = row_depot
+        new_rows = [{**data, "depot_id": depot} for key, data in rows.items()
+                    if key not in existing and key not in foreign]
+        if new_rows:
+            db.execute(insert(spec.model), new_rows)
+        if on_conflict == "update" and existing:
+            db.execute(update(spec.model), [{"id": existing[key], **rows[key]} for key in existing])
+        db.flush()
+    except IntegrityError:
+        # A concurrent writer inserted one of our keys after the lookup; redo the chunk
+        db.rollback()
+        if retries <= 0:
+            raise
+        return _write_chunk(db, spec, rows, on_conflict, retries - 1)
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise ValueError(f"Database error: {str(e)}")
+    if on_conflict == "update":
+        return len(new_rows), len(existing), 0, foreign
+    return len(new_rows), 0, len(existing), foreign
+
+
+def _record_error(errors: list, row, message: str) -> None:
+    if len(errors) < IMPORT_MAX_ERRORS:
+        errors.append({"row": row, "error": message})
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in error.errors()
+    )
@@ -0,0 +1,294 @@
+import logging
+import threading
+import time
+from datetime import timedelta
+from typing import Optional
+
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import LANE_MIN_TRIPS, LANE_REBUILD_SECONDS, LANE_REFRESH_SECONDS
+from app.core.lane_stats import ANY_TYPE, LaneAccumulator, Sample, lane_indexes, lane_key
+from app.core.startup import register_warmup
+from app.core.tenancy import known_depots, session_depot
+from app.core.trip_states import COMPLETED, stored_values
+from app.models.expense import Expense
+from app.models.trip import Trip
+from app.models.vehicle import Vehicle
+
+logger = logging.getLogger(__name__)
+
+_fuel = func.coalesce(Expense.fuel_cost, 0)
+_misc = func.coalesce(Expense.misc_cost, 0)
+
+# Completions are re-read this far below the watermark: a transaction that
+# stamped completed_at earlier may commit after a later one was seen, and
+# workers' clocks differ slightly. Trips completed inside this window keep a
+# per-trip sample in the index so re-reading them is idempotent.
+_COMPLETION_OVERLAP = timedelta(seconds=60)
+
+
+def _max_expense_id(db: Session) -> int:
+    return db.query(func.max(Expense.id)).scalar() or 0
+
+
+def _max_completed_at(db: Session):
+    return db.query(func.max(Trip.completed_at)).scalar()
+
+
+def _window_start(completed):
+    return completed - _COMPLETION_OVERLAP if completed is not None else None
+
+
+def _before_window(window_start):
+    # Completed trips the lane sums hold in aggregate: completed at or before
+    # the window, or before completed_at was recorded at all
+    if window_start is None:
+        return Trip.completed_at.is_(None)
+    return or_(Trip.completed_at.is_(None), Trip.completed_at <= window_start)
+
+
+def _in_window(window_start):
+    if window_start is None:
+        return Trip.completed_at.isnot(None)
+    return Trip.completed_at > window_start
+
+
+def _per_trip(high: int, trip_ids=None):
+    """Expenses up to ``high`` summed per trip; ``trip_ids`` (a select of ids) limits the scan."""
+    expenses = select(Expense.trip_id, func.sum(_fuel).label("fuel"), func.sum(_misc).label("misc"))
+    expenses = expenses.where(Expense.id <= high)
+    if trip_ids is not None:
+        expenses = expenses.where(Expense.trip_id.in_(trip_ids))
+    return expenses.group_by(Expense.trip_id).subquery()
+
+
+def _completed_trips(query, per_trip):
+    return (
+        query.select_from(per_trip)
+        .join(Trip, Trip.id == per_trip.c.trip_id)
+        .join(Vehicle, Vehicle.id == Trip.vehicle_id)
+        .where(Trip.status.in_(stored_values(COMPLETED)), Trip.cargo_weight > 0)
+    )
+
+
+def _lane_sums(db: Session, high: int, window_start) -> dict:
+    """
+    Lanes of the trips completed before the window, aggregated in the
+    database (expenses summed per trip, then per lane); Python only merges
+    lanes whose names differ in internal whitespace.
+    """
+    per_trip = _per_trip(high)
+    x = per_trip.c.fuel / Trip.cargo_weight
+    has_estimate = Trip.fuel_estimate.isnot(None)
+    origin = func.lower(func.trim(Trip.origin))
+    destination = func.lower(func.trim(Trip.destination))
+    vehicle_type = func.lower(func.trim(Vehicle.type))
+    rows = db.execute(
+        _completed_trips(select(
+            origin, destination, vehicle_type,
+            func.count(),
+            func.sum(x),
+            func.sum(x * x),
+            func.sum(per_trip.c.fuel),
+            func.sum(per_trip.c.misc),
+            func.sum(case((has_estimate, 1), else_=0)),
+            func.sum(case((has_estimate, func.abs(per_trip.c.fuel - Trip.fuel_estimate)), else_=0)),
+        ), per_trip)
+        .where(_before_window(window_start))
+        .group_by(origin, destination, vehicle_type)
+    )
+    lanes: dict[tuple, LaneAccumulator] = {}
+    for o, d, t, *sums in rows:
+        key = lane_key(o, d, t)
+        for k in (key, (key[0], key[1], ANY_TYPE)):
+            lanes.setdefault(k, LaneAccumulator()).merge(*(s or 0 for s in sums))
+    return lanes
+
+
+def _recent_samples(db: Session, high: int, window_start):
+    """Yield (trip id, lane key, Sample, completed_at) for trips completed inside the window."""
+    per_trip = _per_trip(high, select(Trip.id).where(_in_window(window_start)))
+    rows = db.execute(
+        _completed_trips(select(
+            Trip.id, Trip.origin, Trip.destination, Vehicle.type, Trip.cargo_weight, Trip.fuel_estimate,
+            Trip.completed_at, per_trip.c.fuel, per_trip.c.misc,
+        ), per_trip)
+        .where(_in_window(window_start))
+    )
+    for id, origin, destination, vehicle_type, cargo_weight, fuel_estimate, completed_at, fuel, misc in rows:
+        yield (id, lane_key(origin, destination, vehicle_type),
+               Sample(fuel, misc, cargo_weight, fuel_estimate), completed_at)
+
+
+def _aggregated_changes(db: Session, low: int, high: int, window_start):
+    """
+    Yield (lane key, old Sample or None, new Sample) for trips held only in
+    the lane sums that got expenses in (low, high]: the old sample sums their
+    expenses up to ``low`` (None if they had none, so weren't counted), the
+    new one up to ``high``.
+    """
+    counted = Expense.id <= low
+    per_trip = (
+        select(
+            Expense.trip_id,
+            func.sum(_fuel).label("fuel"),
+            func.sum(_misc).label("misc"),
+            func.sum(case((counted, _fuel), else_=0)).label("old_fuel"),
+            func.sum(case((counted, _misc), else_=0)).label("old_misc"),
+            func.sum(case((counted, 1), else_=0)).label("old_expenses"),
+        )
+        .where(
+            Expense.id <= high,
+            Expense.trip_id.in_(select(Expense.trip_id).where(Expense.id > low, Expense.id <= high)),
+        )
+        .group_by(Expense.trip_id)
+        .subquery()
+    )
+    rows = db.execute(
+        _completed_trips(select(
+            Trip.origin, Trip.destination, Vehicle.type, Trip.cargo_weight, Trip.fuel_estimate,
+            per_trip.c.fuel, per_trip.c.misc, per_trip.c.old_fuel, per_trip.c.old_misc, per_trip.c.old_expenses,
+        ), per_trip)
+        .where(_before_window(window_start))
+    )
+    for origin, destination, vehicle_type, weight, estimate, fuel, misc, old_fuel, old_misc, old_expenses in rows:
+        old = Sample(old_fuel, old_misc, weight, estimate) if old_expenses else None
+        yield lane_key(origin, destination, vehicle_type), old, Sample(fuel, misc, weight, estimate)
+
+
+# ----------------------------------------
+# Rebuild and catch-up (background)
+# ----------------------------------------
+
+def rebuild_lane_index(db: Session) -> None:
+    """Recompute the session depot's lanes from the full expense history."""
+    index = lane_indexes[session_depot(db)]
+    high = _max_expense_id(db)
+    completed = _max_completed_at(db)
+    window_start = _window_start(completed)
+    lanes = _lane_sums(db, high, window_start)
+    recent = {id: (key, sample, completed_at)
+              for id, key, sample, completed_at in _recent_samples(db, high, window_start)}
+    index.replace(lanes, recent, high, completed)
+    index.rebuilt_at = time.monotonic()
+    logger.info(f"Lane index for depot {session_depot(db)} rebuilt: {len(index)} lanes up to expense {high}")
+
+
+def _catch_up(db: Session, index) -> None:
+    low = index.watermark
+    high = _max_expense_id(db)
+    completed = _max_completed_at(db)
+    if high <= low and completed == index.completed_watermark:
+        return
+    window_start = _window_start(index.completed_watermark)
+    # Trips completed inside the window (including since the last pass) are
+    # re-read whole; aggregated trips with new expenses get a delta.
+    applied = 0
+    for id, key, sample, completed_at in _recent_samples(db, high, window_start):
+        index.set_sample(id, key, sample, completed_at)
+        applied += 1
+    if high > low:
+        for key, old, new in _aggregated_changes(db, low, high, window_start):
+            index.apply_delta(key, old, new)
+            applied += 1
+    index.advance(high, completed, _window_start(completed))
+    logger.debug(f"Lane index caught up to expense {high}: {applied} trips updated")
+
+
+def refresh_lane_index(db: Session) -> None:
+    """
+    Bring the session depot's index up to date with what any worker wrote:
+    re-read the trips completed inside the window and apply expenses past
+    the watermark to older trips as deltas - or rebuild when the index is
+    older than LANE_REBUILD_SECONDS, which also picks up expenses committed
+    out of id order.
+    """
+    index = lane_indexes[session_depot(db)]
+    with index.refresh_lock:
+        if not index.enabled or time.monotonic() - index.rebuilt_at >= LANE_REBUILD_SECONDS:
+            rebuild_lane_index(db)
+        else:
+            _catch_up(db, index)
+
+
+def refresh_lane_indexes() -> None:
+    """Refresh the configured depots plus any other depot whose index was loaded on demand."""
+    from app.core.database import depot_session
+
+    for depot in sorted(set(known_depots()) | set(list(lane_indexes))):
+        db = depot_session(depot)
+        try:
+            refresh_lane_index(db)
+        finally:
+            db.close()
+
+
+class _LaneRefresher(threading.Thread):
+    """Per-worker loop refreshing every depot's lane index each LANE_REFRESH_SECONDS."""
+
+    def __init__(self):
+        super().__init__(name="lane-refresher", daemon=True)
+
+    def run(self) -> None:
+        while True:
+            time.sleep(LANE_REFRESH_SECONDS)
+            try:
+                refresh_lane_indexes()
+            except Exception as e:
+                # Keep the loop alive; the next tick retries.
+                logger.error(f"Lane index refresh failed: {str(e)}", exc_info=True)
+
+
+_refresher: Optional[_LaneRefresher] = None
+
+
+def start_lane_indexes() -> None:
+    global _refresher
+
+    # Started before the initial load so a failed load is retried.
+    if _refresher is None and LANE_REFRESH_SECONDS > 0:
+        _refresher = _LaneRefresher()
+        _refresher.start()
+    refresh_lane_indexes()
+
+register_warmup("lane_index", start_lane_indexes)
+
+
+def record_expense(expense: Expense) -> None:
+    """Fold a just-committed expense into its trip's lane; no database access."""
+    lane_indexes[expense.depot_id].add_expense(
+        expense.trip_id, expense.id, expense.fuel_cost or 0, expense.misc_cost or 0
+    )
+
+
+# ----------------------------------------
+# Queries (served from memory)
+# ----------------------------------------
+
+def _loaded_index(db: Session):
+    # Depots outside configuration (DEPOTS empty) are built on their first use
+    index = lane_indexes[session_depot(db)]
+    if not index.enabled:
+        refresh_lane_index(db)
+    return index
+
+
+def estimate_fuel(db: Session, origin: str, destination: str, vehicle_type: str,
+                  cargo_weight: float) -> Optional[float]:
+    """Expected fuel cost for a new trip from its lane's history, or None without enough history."""
+    return _loaded_index(db).estimate(
+        lane_key(origin, destination, vehicle_type), cargo_weight, LANE_MIN_TRIPS
+    )
+
+
+def get_lanes(db: Session, origin: Optional[str] = None, destination: Optional[str] = None,
+              vehicle_type: Optional[str] = None, min_trips: int = 1,
+              limit: int = 100, offset: int = 0):
+    """
+    Lane statistics for the session's depot.
+
+    Returns (lanes, has_more).
+    """
+    lanes = _loaded_index(db).lanes(origin, destination, vehicle_type, min_trips)
+    return lanes[offset:offset + limit], len(lanes) > offset + limit
@@ -0,0 +1,259 @@
+import logging
+import re
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import or_
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import SEARCH_BACKEND, SEARCH_INDEX_REFRESH_SECONDS, SEARCH_INDEX_RELOAD_SECONDS
+from app.core.search_index import (
+    SCORE_EXACT,
+    SCORE_PREFIX,
+    SearchIndex,
+    normalize,
+    search_indexes,
+)
+from app.core.startup import register_warmup
+from app.core.tenancy import known_depots, session_depot
+from app.models.driver import Driver
+from app.models.trip import Trip
+from app.models.vehicle import Vehicle
+
+logger = logging.getLogger(__name__)
+
+SEARCH_KINDS = ("vehicle", "driver", "trip")
+
+# InnoDB does not index words shorter than innodb_ft_min_token_size (3)
+_FULLTEXT_MIN_WORD = 3
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+# ----------------------------------------
+# In-process index maintenance
+# ----------------------------------------
+
+def index_vehicle(vehicle: Vehicle, search_index: Optional[SearchIndex] = None) -> None:
+    if search_index is None:
+        search_index = search_indexes[vehicle.depot_id]
+    search_index.add("vehicle", vehicle.id, f"{vehicle.plate} ({vehicle.model})",
+                     identifiers=(vehicle.plate,), text=(vehicle.model,))
+
+def index_driver(driver: Driver, search_index: Optional[SearchIndex] = None) -> None:
+    if search_index is None:
+        search_index = search_indexes[driver.depot_id]
+    search_index.add("driver", driver.id, f"{driver.name} ({driver.license_number})",
+                     identifiers=(driver.license_number,), text=(driver.name,))
+
+def index_trip(trip: Trip, search_index: Optional[SearchIndex] = None) -> None:
+    if search_index is None:
+        search_index = search_indexes[trip.depot_id]
+    search_index.add("trip", trip.id, f"{trip.origin} → {trip.destination}",
+                     text=(trip.origin, trip.destination))
+
+_INDEXERS = (
+    ("vehicle", Vehicle, index_vehicle),
+    ("driver", Driver, index_driver),
+    ("trip", Trip, index_trip),
+)
+
+
+def uses_memory_index(db: Session) -> bool:
+    return SEARCH_BACKEND == "memory" or db.get_bind().dialect.name != "mysql"
+
+
+def refresh_search_index(db: Session, force: bool = False) -> None:
+    """Load the session depot's rows inserted since the last refresh (including by other workers)."""
+    search_index = search_indexes[session_depot(db)]
+    now = time.monotonic()
+    if not force and now - search_index.refreshed_at < SEARCH_INDEX_REFRESH_SECONDS:
+        return
+    search_index.refreshed_at = now
+    _load_rows(db, search_index)
+
+
+def _load_rows(db: Session, search_index: SearchIndex) -> None:
+    for kind, model, indexer in _INDEXERS:
+        watermark = search_index.watermarks.get(kind, 0)
+        query = db.query(model).filter(model.id > watermark).order_by(model.id)
+        for row in query.yield_per(5000):
+            indexer(row, search_index)
+            watermark = row.id
+        search_index.watermarks[kind] = watermark
+    db.expunge_all()
+
+
+def load_search_index(depot: str) -> None:
+    """
+    (Re)load the depot's index from scratch.
+
+    The rows are loaded into a fresh index that then replaces the live one,
+    so searches keep being served meanwhile. Rows added to the live index
+    during the load have higher ids and come back with the next refresh.
+    """
+    from app.core.database import depot_session
+
+    db = depot_session(depot)
+    try:
+        if not uses_memory_index(db):
+            return
+        fresh = SearchIndex()
+        fresh.enabled = True
+        _load_rows(db, fresh)
+        search_index = search_indexes[depot]
+        search_index.replace(fresh)
+        search_index.enabled = True
+        search_index.refreshed_at = time.monotonic()
+        logger.info(f"Search index for depot {depot} loaded: {len(search_index)} documents")
+    finally:
+        db.close()
+
+
+class _SearchIndexReloader(threading.Thread):
+    """
+    Per-worker loop reloading every loaded index each SEARCH_INDEX_RELOAD_SECONDS.
+
+    The catch-up query only reads ids above the watermark, so a row whose
+    lower id commits after a higher one was indexed (concurrent workers) is
+    missed until the next full reload.
+    """
+
+    def __init__(self):
+        super().__init__(name="search-index-reloader", daemon=True)
+
+    def run(self) -> None:
+        while True:
+            time.sleep(SEARCH_INDEX_RELOAD_SECONDS)
+            for depot, search_index in list(search_indexes.items()):
+                if not search_index.enabled:
+                    continue
+                try:
+                    load_search_index(depot)
+                except SQLAlchemyError as e:
+                    logger.error(f"Search index reload for depot {depot} failed: {str(e)}")
+
+
+_reloader: Optional[_SearchIndexReloader] = None
+
+
+def load_search_indexes() -> None:
+    global _reloader
+
+    if _reloader is None and SEARCH_INDEX_RELOAD_SECONDS > 0:
+        _reloader = _SearchIndexReloader()
+        _reloader.start()
+    for depot in known_depots():
+        load_search_index(depot)
+
+register_warmup("search_index", load_search_indexes)
+
+
+# ----------------------------------------
+# Queries
+# ----------------------------------------
+
+def search(db: Session, q: str, kinds=None, limit: int = 20, offset: int = 0):
+    """
+    Ranked search over vehicle plates, driver names/license numbers and trip
+    origins/destinations.
+
+    Returns (results, has_more).
+    """
+    kinds = set(kinds or SEARCH_KINDS)
+    try:
+        if uses_memory_index(db):
+            search_index = search_indexes[session_depot(db)]
+            if not search_index.enabled:
+                load_search_index(session_depot(db))
+            refresh_search_index(db)
+            hits = search_index.search(q, kinds, limit=limit + 1, offset=offset)
+        else:
+            hits = _search_mysql(db, q, kinds, window=offset + limit + 1)[offset:]
+    except SQLAlchemyError as e:
+        logger.error(f"Database error searching for {q!r}: {str(e)}")
+        raise ValueError(f"Database error: {str(e)}")
+    return hits[:limit], len(hits) > limit
+
+
+def _search_mysql(db: Session, q: str, kinds: set, window: int) -> list[dict]:
+    q = normalize(q)
+    prefix = _escape_like(q) + "%"
+    words = [w for w in _WORD_RE.findall(q) if len(w) >= _FULLTEXT_MIN_WORD]
+    boolean_query = " ".join(f"+{w}*" for w in words)
+    hits: dict[tuple, dict] = {}
+
+    def add(kind, id, label, score):
+        current = hits.get((kind, id))
+        if current is None or current["score"] < score:
+            hits[(kind, id)] = {"kind": kind, "id": id, "label": label, "score": score}
+
+    if "vehicle" in kinds:
+        # Served by the unique B-tree index on plate
+        rows = (
+            db.query(Vehicle.id, Vehicle.plate, Vehicle.model)
+            .filter(Vehicle.plate.like(prefix, escape="\\"))
+            .order_by(Vehicle.plate)
+            .limit(window)
+        )
+        for id, plate, model in rows:
+            add("vehicle", id, f"{plate} ({model})", _identifier_score(q, plate))
+
+    if "driver" in kinds:
+        rows = (
+            db.query(Driver.id, Driver.name, Driver.license_number)
+            .filter(Driver.license_number.like(prefix, escape="\\"))
+            .order_by(Driver.license_number)
+            .limit(window)
+        )
+        for id, name, license_number in rows:
+            add("driver", id, f"{name} ({license_number})", _identifier_score(q, license_number))
+        for id, name, license_number, relevance in _text_matches(
+            db, (Driver.id, Driver.name, Driver.license_number), (Driver.name,), boolean_query, prefix, window
+        ):
+            add("driver", id, f"{name} ({license_number})", _text_score(relevance))
+
+    if "trip" in kinds:
+        for id, origin, destination, relevance in _text_matches(
+            db, (Trip.id, Trip.origin, Trip.destination), (Trip.origin, Trip.destination), boolean_query, prefix, window
+        ):
+            add("trip", id, f"{origin} → {destination}", _text_score(relevance))
+
+    ranked = sorted(hits.values(), key=lambda h: (-h["score"], h["kind"], h["id"]))
+    return ranked[:window]
+
+
+def _text_matches(db: Session, columns: tuple, text_columns: tuple, boolean_query: str, prefix: str, window: int):
+    if boolean_query:
+        relevance = match(*text_columns, against=boolean_query).in_boolean_mode()
+        return (
+            db.query(*columns, relevance)
+            .filter(relevance > 0)
+            .order_by(relevance.desc())
+            .limit(window)
+            .all()
+        )
+    # Every word is below the FULLTEXT token size; fall back to a bounded prefix scan.
+    rows = (
+        db.query(*columns)
+        .filter(or_(*(c.like(prefix, escape="\\") for c in text_columns)))
+        .limit(window)
+        .all()
+    )
+    return [(*row, 0.0) for row in rows]
+
+
+def _identifier_score(q: str, value: str) -> float:
+    return SCORE_EXACT if normalize(value) == q else SCORE_PREFIX
+
+
+def _text_score(relevance) -> float:
+    # Map MySQL relevance (unbounded, >= 0) into [1, 2) so free-text hits rank below identifier hits
+    relevance = float(relevance or 0)
+    return round(1 + relevance / (1 + relevance), 4)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
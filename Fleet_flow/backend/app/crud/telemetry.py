@@ -0,0 +1,111 @@
+import logging
+from datetime import datetime
+
+from sqlalchemy import case, insert, or_, update
+from sqlalchemy.exc import DBAPIError, OperationalError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    TELEMETRY_BUFFER_SIZE,
+    TELEMETRY_FLUSH_MS,
+    TELEMETRY_FLUSH_RETRIES,
+    TELEMETRY_FLUSH_SIZE,
+)
+from app.core.startup import register_shutdown, register_warmup
+from app.core.tenancy import session_depot
+from app.core.write_buffer import WriteBuffer
+from app.models.telemetry import TelemetryReading
+from app.models.vehicle import Vehicle
+
+logger = logging.getLogger(__name__)
+
+
+def flush_readings(depot: str, rows: list[dict]) -> None:
+    """
+    Write one depot's batch in a single transaction: one multi-row INSERT
+    into telemetry_readings, then one set-based UPDATE moving each vehicle's
+    odometer to its latest reading in the batch. Odometers only ever move
+    forward, so batches flushed out of order cannot roll one back.
+    """
+    from app.core.database import depot_session
+
+    latest: dict[int, tuple] = {}
+    for row in rows:
+        if row["odometer"] is None:
+            continue
+        current = latest.get(row["vehicle_id"])
+        if current is None or row["recorded_at"] >= current[0]:
+            latest[row["vehicle_id"]] = (row["recorded_at"], row["odometer"])
+
+    db = depot_session(depot)
+    try:
+        db.execute(insert(TelemetryReading), [{**row, "depot_id": depot} for row in rows])
+        if latest:
+            new_odometer = case({id: odometer for id, (_, odometer) in latest.items()}, value=Vehicle.id)
+            db.execute(
+                update(Vehicle)
+                .where(Vehicle.id.in_(list(latest)),
+                       or_(Vehicle.odometer.is_(None), Vehicle.odometer < new_odometer))
+                .values(odometer=new_odometer)
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+        logger.debug(f"Telemetry flush: {len(rows)} readings, {len(latest)} odometers in depot {depot}")
+    except SQLAlchemyError:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def is_transient(error: Exception) -> bool:
+    # Deadlocks, lock wait timeouts and lost connections are OperationalErrors;
+    # integrity and data errors would fail the same way again.
+    return isinstance(error, OperationalError) or (
+        isinstance(error, DBAPIError) and error.connection_invalidated
+    )
+
+
+telemetry_buffer = WriteBuffer(
+    "telemetry",
+    flush_readings,
+    capacity=TELEMETRY_BUFFER_SIZE,
+    flush_size=TELEMETRY_FLUSH_SIZE,
+    flush_interval=TELEMETRY_FLUSH_MS / 1000,
+    is_transient=is_transient,
+    retries=TELEMETRY_FLUSH_RETRIES,
+)
+
+register_warmup("telemetry_buffer", telemetry_buffer.start)
+register_shutdown("telemetry_buffer", telemetry_buffer.stop)
+
+
+def ingest_readings(db: Session, readings: list):
+    """
+    Queue a batch of readings for the session's depot.
+
+    Readings for vehicles that don't exist in the depot are dropped (one
+    ``WHERE id IN (...)`` lookup per batch). Nothing is written here; the
+    buffer's flusher commits the rows.
+
+    Returns (accepted, rejected_vehicle_ids), or None if the buffer is full.
+
+    Raises:
+        ValueError: For database errors
+    """
+    vehicle_ids = {r.vehicle_id for r in readings}
+    try:
+        known = {id for (id,) in db.query(Vehicle.id).filter(Vehicle.id.in_(vehicle_ids))}
+    except SQLAlchemyError as e:
+        logger.error(f"Database error checking telemetry vehicles: {str(e)}")
+        raise ValueError(f"Database error: {str(e)}")
+
+    received_at = datetime.utcnow()
+    rows = [
+        {**r.model_dump(), "received_at": received_at}
+        for r in readings
+        if r.vehicle_id in known
+    ]
+    if rows and not telemetry_buffer.offer(session_depot(db), rows):
+        return None
+    return len(rows), sorted(vehicle_ids - known)
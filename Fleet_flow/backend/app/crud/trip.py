@@ -1,8 +1,29 @@
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session, joinedload, selectinload
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from app.models.trip import Trip
 from app.models.vehicle import Vehicle
 from app.models.driver import Driver
+from app.crud.lanes import estimate_fuel
+from app.crud.search import index_trip
+from app.core.trip_states import (
+    COMPLETED,
+    DRAFT,
+    DRIVER_AVAILABLE_STATES,
+    DRIVER_ON_DUTY,
+    DRIVER_ON_TRIP,
+    VEHICLE_AVAILABLE,
+    VEHICLE_AVAILABLE_STATES,
+    VEHICLE_ON_TRIP,
+    TripNotFoundError,
+    TripTransitionError,
+    canonical_state,
+    get_transition,
+    stored_values,
+)
 from app.schemas.trip import TripCreate
 import logging
 
@@ -11,11 +32,23 @@ logger = logging.getLogger(__name__)
 def create_trip(db: Session, trip: TripCreate):
     """
     Create a new trip with validation of foreign key constraints.
+
+    Trips are always created as Draft, holding neither vehicle nor driver;
+    dispatching goes through transition_trip so the claim is checked.
+
+    A missing fuel_estimate is filled in from the lane statistics of the
+    trip's origin, destination and vehicle type (left empty without enough
+    history).
     
     Raises:
-        ValueError: If vehicle_id or driver_id don't exist, or other validation issues
+        ValueError: If vehicle_id or driver_id don't exist, status is not Draft,
+            or other validation issues
         SQLAlchemyError: For database errors
     """
+    if trip.status is not None and canonical_state(trip.status) != DRAFT:
+        raise ValueError(
+            f"New trips start as {DRAFT}; move them to {trip.status!r} with PATCH /trips/{{id}}/transition"
+        )
     try:
         # Validate that vehicle exists
         vehicle = db.query(Vehicle).filter(Vehicle.id == trip.vehicle_id).first()
@@ -30,10 +63,13 @@ def create_trip(db: Session, trip: TripCreate):
             raise ValueError(f"Driver with ID {trip.driver_id} not found")
         
         # Create trip
-        db_trip = Trip(**trip.dict())
+        db_trip = Trip(**{**trip.dict(), "status": DRAFT})
+        if db_trip.fuel_estimate is None:
+            db_trip.fuel_estimate = estimate_fuel(db, trip.origin, trip.destination, vehicle.type, trip.cargo_weight)
         db.add(db_trip)
         db.commit()
         db.refresh(db_trip)
+        index_trip(db_trip)
         logger.info(f"Trip created: id={db_trip.id}, vehicle_id={trip.vehicle_id}, driver_id={trip.driver_id}")
         return db_trip
         
@@ -54,4 +90,129 @@ def get_trips(db: Session):
         return trips
     except SQLAlchemyError as e:
         logger.error(f"Database error fetching trips: {str(e)}")
-        raise ValueError(f"Database error: {str(e)}")
\ No newline at end of file
+        raise ValueError(f"Database error: {str(e)}")
+
+def _with_details(query):
+    # Vehicle and driver are joined into the trip query; expenses come from
+    # one extra "WHERE trip_id IN (...)" query. Vehicles/drivers shared by
+    # several trips are materialised once and reused through the session's
+    # identity map.
+    return query.options(
+        joinedload(Trip.vehicle),
+        joinedload(Trip.driver),
+        selectinload(Trip.expenses),
+    )
+
+def get_trip_detail(db: Session, trip_id: int):
+    """
+    Get one trip with its vehicle, driver and expenses (two queries).
+
+    Raises:
+        TripNotFoundError: If trip_id doesn't exist
+        ValueError: For database errors
+    """
+    try:
+        trip = _with_details(db.query(Trip)).filter(Trip.id == trip_id).first()
+    except SQLAlchemyError as e:
+        logger.error(f"Database error fetching trip {trip_id}: {str(e)}")
+        raise ValueError(f"Database error: {str(e)}")
+    if trip is None:
+        raise TripNotFoundError(f"Trip with ID {trip_id} not found")
+    return trip
+
+def get_trips_expanded(db: Session, limit: int = 50, offset: int = 0):
+    """Get a page of trips with vehicle, driver and expenses (two queries per page)."""
+    try:
+        trips = _with_details(db.query(Trip)).order_by(Trip.id).offset(offset).limit(limit).all()
+        logger.info(f"Retrieved {len(trips)} expanded trips (offset={offset})")
+        return trips
+    except SQLAlchemyError as e:
+        logger.error(f"Database error fetching expanded trips: {str(e)}")
+        raise ValueError(f"Database error: {str(e)}")
+
+def transition_trip(db: Session, trip_id: int, target: str, expected_status: Optional[str] = None):
+    """
+    Move a trip to ``target`` and update its vehicle and driver in one transaction.
+
+    Every write is a conditional ``UPDATE ... WHERE status IN (...)`` whose
+    affected row count is checked, so concurrent dispatchers cannot both
+    succeed: the loser sees zero rows updated and gets TripTransitionError.
+    Rows are always updated trip -> vehicle -> driver to keep lock order
+    consistent between transactions.
+
+    Raises:
+        TripNotFoundError: If trip_id doesn't exist
+        TripTransitionError: If the transition isn't allowed from the current
+            state, or the trip/vehicle/driver changed concurrently
+        ValueError: For database errors
+    """
+    try:
+        trip = (
+            db.query(Trip.status, Trip.vehicle_id, Trip.driver_id, Trip.resources_claimed)
+            .filter(Trip.id == trip_id)
+            .first()
+        )
+        if trip is None:
+            raise TripNotFoundError(f"Trip with ID {trip_id} not found")
+
+        # The status read above only picks the transition; the conditional
+        # update below is what guarantees it still holds.
+        transition = get_transition(expected_status or trip.status, target)
+
+        values = {"status": transition.target}
+        if transition.claim_resources:
+            values["resources_claimed"] = True
+        elif transition.release_resources:
+            values["resources_claimed"] = False
+        if transition.target == COMPLETED:
+            values["completed_at"] = datetime.utcnow()
+        updated = db.execute(
+            update(Trip)
+            .where(Trip.id == trip_id, Trip.status.in_(stored_values(transition.source)))
+            .values(**values)
+        ).rowcount
+        if updated != 1:
+            raise TripTransitionError(f"Trip {trip_id} is no longer {transition.source}")
+
+        if transition.claim_resources:
+            updated = db.execute(
+                update(Vehicle)
+                .where(Vehicle.id == trip.vehicle_id, Vehicle.status.in_(VEHICLE_AVAILABLE_STATES))
+                .values(status=VEHICLE_ON_TRIP)
+            ).rowcount
+            if updated != 1:
+                raise TripTransitionError(f"Vehicle {trip.vehicle_id} is not available")
+            updated = db.execute(
+                update(Driver)
+                .where(Driver.id == trip.driver_id, Driver.status.in_(DRIVER_AVAILABLE_STATES))
+                .values(status=DRIVER_ON_TRIP)
+            ).rowcount
+            if updated != 1:
+                raise TripTransitionError(f"Driver {trip.driver_id} is not available")
+
+        if transition.release_resources and trip.resources_claimed:
+            # Only release what this trip claimed: trips that never went
+            # through dispatch (legacy rows) hold nothing, and a vehicle moved
+            # to the shop meanwhile keeps its status.
+            db.execute(
+                update(Vehicle)
+                .where(Vehicle.id == trip.vehicle_id, Vehicle.status == VEHICLE_ON_TRIP)
+                .values(status=VEHICLE_AVAILABLE)
+            )
+            db.execute(
+                update(Driver)
+                .where(Driver.id == trip.driver_id, Driver.status == DRIVER_ON_TRIP)
+                .values(status=DRIVER_ON_DUTY)
+            )
+
+        db.commit()
+        logger.info(f"Trip transitioned: id={trip_id}, {transition.source} -> {transition.target}")
+        return db.get(Trip, trip_id)
+
+    except (TripNotFoundError, TripTransitionError):
+        db.rollback()
+        raise
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Database error transitioning trip: {str(e)}")
+        raise ValueError(f"Database error: {str(e)}")
@@ -1,12 +1,29 @@
+import logging
+
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from app.core.tenancy import DuplicateKeyError
 from app.models.vehicle import Vehicle
+from app.crud.search import index_vehicle
 from app.schemas.vehicle import VehicleCreate
 
+logger = logging.getLogger(__name__)
+
 def create_vehicle(db: Session, vehicle: VehicleCreate):
+    """
+    Raises:
+        DuplicateKeyError: If the plate is already registered (in any depot)
+    """
     db_vehicle = Vehicle(**vehicle.dict())
     db.add(db_vehicle)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        logger.warning(f"Integrity error creating vehicle {vehicle.plate!r}: {str(e)}")
+        raise DuplicateKeyError(f"Vehicle with plate {vehicle.plate!r} already exists")
     db.refresh(db_vehicle)
+    index_vehicle(db_vehicle)
     return db_vehicle
 
 def get_vehicles(db: Session):
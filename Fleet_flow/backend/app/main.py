@@ -1,7 +1,12 @@
-import os
+import importlib
 import logging
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
+
+from app.core.startup import startup_timer
+
+with startup_timer.phase("import:framework"):
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
 
 # Configure logging for debugging
 logging.basicConfig(
@@ -11,22 +16,66 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Database
-from app.core.database import engine, Base
+with startup_timer.phase("import:database"):
+    from app.core.config import (
+        DB_POOL_WARM,
+        ENVIRONMENT,
+        LOAD_SHED_ENABLED,
+        RATE_LIMIT_ENABLED,
+    )
+    from app.core.database import dispose_engines, engine
+    from app.core.idempotency import IdempotencyMiddleware
+    from app.core.profiling import ProfilingMiddleware
+    from app.core.rate_limit import LoadShedMiddleware, RateLimitMiddleware
+    from app.core.startup import (
+        DeferredRouterMiddleware,
+        create_schema,
+        run_shutdown_hooks,
+        run_warmups,
+        schema_ready,
+        warm_connection_pool,
+    )
+
+# Routers are imported one by one below so each shows up in the startup
+# breakdown. Model modules are pulled in by the routers that use them; the
+# full set is only imported when the schema has to be created.
+ROUTER_MODULES = (
+    "app.api.vehicle",
+    "app.api.driver",
+    "app.api.trip",
+    "app.api.maintenance",
+    "app.api.expense",
+    "app.api.search",
+)
+
+# Rarely used or heavier routers, imported on the worker's first request
+# (DeferredRouterMiddleware) so they don't delay readiness.
+DEFERRED_ROUTER_MODULES = (
+    "app.api.analytics",
+    "app.api.imports",
+    "app.api.admin",
+    "app.api.telemetry",
+)
+
 
-# Import model modules so SQLAlchemy registers them
-import app.models.vehicle
-import app.models.driver
-import app.models.trip
-import app.models.maintenance
-import app.models.expense
+# ----------------------------------------
+# Lifespan (runs once per worker process)
+# ----------------------------------------
 
-# Routers
-from app.api.vehicle import router as vehicle_router
-from app.api.driver import router as driver_router
-from app.api.trip import router as trip_router
-from app.api.maintenance import router as maintenance_router
-from app.api.expense import router as expense_router
-from app.api.analytics import router as analytics_router
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # app.server creates the schema once before forking workers; a plain
+    # `uvicorn app.main:app --reload` still creates it here.
+    if not schema_ready():
+        with startup_timer.phase("create_schema"):
+            create_schema()
+    with startup_timer.phase("warm_pool"):
+        warm_connection_pool(engine, DB_POOL_WARM)
+    run_warmups()
+    startup_timer.mark_ready()
+    yield
+    run_shutdown_hooks()
+    dispose_engines()
 
 
 # ----------------------------------------
@@ -36,9 +85,34 @@ from app.api.analytics import router as analytics_router
 app = FastAPI(
     title="FleetFlow API",
     description="Fleet Management System Backend",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
+# ----------------------------------------
+# Traffic Control and Idempotency-Key Handling
+#
+# Each add_middleware() wraps the previous ones, so requests pass through
+# CORS -> rate limiting -> idempotency -> load shedding -> profiling ->
+# deferred router import -> routers.
+# All of these are registered before CORS so that CORS stays the outermost
+# middleware and 429/503s and replayed responses still get CORS headers.
+# Load shedding sits inside idempotency so replays never take a slot, and
+# profiling sits innermost so profiles only cover the request's own work.
+# ----------------------------------------
+
+app.add_middleware(DeferredRouterMiddleware, target=app, modules=DEFERRED_ROUTER_MODULES)
+
+app.add_middleware(ProfilingMiddleware)
+
+if LOAD_SHED_ENABLED:
+    app.add_middleware(LoadShedMiddleware)
+
+app.add_middleware(IdempotencyMiddleware)
+
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
 # ----------------------------------------
 # CORS Configuration (MUST BE FIRST!)
 # 
@@ -72,9 +146,7 @@ app = FastAPI(
 #   PROD: Only allow your actual domain (e.g., yourdomain.com)
 # ----------------------------------------
 
-# Determine allowed origins based on environment
-ENVIRONMENT = os.getenv("ENVIRONMENT", "development").lower()
-
+# Allowed origins depend on ENVIRONMENT (see app/core/config.py)
 if ENVIRONMENT == "production":
     # Production: ONLY allow your actual domain
     # NEVER use localhost/127.0.0.1 in production!
@@ -112,29 +184,20 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["Retry-After", "Idempotent-Replayed"],
     max_age=3600,
 )
 
-# ----------------------------------------
-# Database Startup
-# ----------------------------------------
-
-@app.on_event("startup")
-def create_tables() -> None:
-    Base.metadata.create_all(bind=engine)
-
 # ----------------------------------------
 # Include Routers
 # ----------------------------------------
 
-app.include_router(vehicle_router)
-app.include_router(driver_router)
-app.include_router(trip_router)
-app.include_router(maintenance_router)
-app.include_router(expense_router)
-app.include_router(analytics_router)
+for module_name in ROUTER_MODULES:
+    with startup_timer.phase(f"import:{module_name}"):
+        router_module = importlib.import_module(module_name)
+    app.include_router(router_module.router)
 
 # ----------------------------------------
 # Root Route
@@ -153,4 +216,9 @@ def root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "OK"}
\ No newline at end of file
+    return {"status": "OK"}
+
+@app.get("/health/startup")
+def startup_breakdown():
+    """Per-phase startup timings of the worker that served this request."""
+    return startup_timer.as_dict()
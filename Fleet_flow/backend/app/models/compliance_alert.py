@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
+from app.core.database import Base
+from app.core.tenancy import DepotScoped
+
+class ComplianceAlert(DepotScoped, Base):
+    __tablename__ = "compliance_alerts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50))  # driver_license / vehicle_inspection
+    entity_id = Column(Integer)
+    due_date = Column(String(50))
+    threshold_days = Column(Integer)
+    fired_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # One row per alert; the insert doubles as a cross-worker "fire once" lock.
+        UniqueConstraint("depot_id", "kind", "entity_id", "due_date", "threshold_days", name="uq_compliance_alert"),
+    )
@@ -1,11 +1,23 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Index
+from sqlalchemy.orm import relationship
 from app.core.database import Base
+from app.core.tenancy import DepotScoped
 
-class Driver(Base):
+class Driver(DepotScoped, Base):
     __tablename__ = "drivers"
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100))
     license_number = Column(String(100), unique=True, index=True)
     expiry_date = Column(String(50))
-    status = Column(String(50))  # On Duty / Off Duty / Suspended
\ No newline at end of file
+    status = Column(String(50))  # On Duty / Off Duty / Suspended
+
+    trips = relationship("Trip", back_populates="driver", lazy="raise_on_sql")
+
+    __table_args__ = (
+        # Ranked name search (GET /search); MySQL only. Prefix lookups on
+        # license_number use the unique index above.
+        Index("ft_drivers_name", "name", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+        # Per-depot status counts (GET /analytics/dashboard)
+        Index("ix_drivers_depot_status", "depot_id", "status"),
+    )
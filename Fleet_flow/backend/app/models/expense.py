@@ -1,10 +1,14 @@
 from sqlalchemy import Column, Integer, Float, ForeignKey
+from sqlalchemy.orm import relationship
 from app.core.database import Base
+from app.core.tenancy import DepotScoped
 
-class Expense(Base):
+class Expense(DepotScoped, Base):
     __tablename__ = "expenses"
 
     id = Column(Integer, primary_key=True, index=True)
-    trip_id = Column(Integer, ForeignKey("trips.id"))
+    trip_id = Column(Integer, ForeignKey("trips.id"), index=True)
     fuel_cost = Column(Float)
-    misc_cost = Column(Float)
\ No newline at end of file
+    misc_cost = Column(Float)
+
+    trip = relationship("Trip", back_populates="expenses", lazy="raise_on_sql")
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String, Float, Text, LargeBinary
+from app.core.database import Base
+
+class IdempotencyRecord(Base):
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(64), primary_key=True)  # sha256 of method + path + Idempotency-Key
+    fingerprint = Column(String(64))  # sha256 of the request body
+    status_code = Column(Integer, nullable=True)  # NULL while the first request is in flight
+    headers = Column(Text)  # JSON list of [name, value] pairs
+    body = Column(LargeBinary)
+    expires_at = Column(Float, index=True)
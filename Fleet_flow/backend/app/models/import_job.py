@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from app.core.database import Base
+from app.core.tenancy import DepotScoped
+
+class ImportJob(DepotScoped, Base):
+    __tablename__ = "import_jobs"
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    kind = Column(String(20))  # vehicles / drivers
+    filename = Column(String(255))
+    on_conflict = Column(String(10))  # update / skip
+    status = Column(String(20))  # Queued / Running / Completed / Failed
+    rows_processed = Column(Integer, default=0)
+    inserted = Column(Integer, default=0)
+    updated = Column(Integer, default=0)
+    skipped = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    errors = Column(Text)  # JSON list of {"row": n, "error": "..."}, capped at IMPORT_MAX_ERRORS
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
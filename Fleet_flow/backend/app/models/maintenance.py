@@ -1,12 +1,21 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, ForeignKey, Float, Index
+from sqlalchemy.orm import relationship
 from app.core.database import Base
+from app.core.tenancy import DepotScoped
 
-class Maintenance(Base):
+class Maintenance(DepotScoped, Base):
     __tablename__ = "maintenance"
 
     id = Column(Integer, primary_key=True, index=True)
-    vehicle_id = Column(Integer, ForeignKey("vehicles.id"))
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), index=True)
     issue = Column(String(200))
     date = Column(String(50))
     status = Column(String(50))
-    cost = Column(Float)
\ No newline at end of file
+    cost = Column(Float)
+
+    vehicle = relationship("Vehicle", back_populates="maintenance_records", lazy="raise_on_sql")
+
+    __table_args__ = (
+        # Per-depot status counts and cost totals (GET /analytics/dashboard)
+        Index("ix_maintenance_depot_status", "depot_id", "status", "cost"),
+    )
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, Integer, Float, DateTime, Index
+from app.core.database import Base
+from app.core.tenancy import DepotScoped
+
+class TelemetryReading(DepotScoped, Base):
+    __tablename__ = "telemetry_readings"
+
+    # Append-only and high-volume: no foreign key (vehicle ids are checked at
+    # ingest) so inserts never lock vehicle rows.
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    vehicle_id = Column(Integer, nullable=False)
+    recorded_at = Column(DateTime, nullable=False)
+    odometer = Column(Float, nullable=True)
+    fuel_liters = Column(Float, nullable=True)  # set on fill-ups
+    fuel_cost = Column(Float, nullable=True)
+    received_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_telemetry_vehicle_recorded", "vehicle_id", "recorded_at"),
+    )
@@ -1,14 +1,34 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Float
+from sqlalchemy import Boolean, Column, DateTime, Integer, String, ForeignKey, Float, Index
+from sqlalchemy.orm import relationship
 from app.core.database import Base
+from app.core.tenancy import DepotScoped
 
-class Trip(Base):
+class Trip(DepotScoped, Base):
     __tablename__ = "trips"
 
     id = Column(Integer, primary_key=True, index=True)
-    vehicle_id = Column(Integer, ForeignKey("vehicles.id"))
-    driver_id = Column(Integer, ForeignKey("drivers.id"))
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), index=True)
+    driver_id = Column(Integer, ForeignKey("drivers.id"), index=True)
     origin = Column(String(200))
     destination = Column(String(200))
     cargo_weight = Column(Float)
     fuel_estimate = Column(Float)
-    status = Column(String(50))  # Draft / Dispatched / Completed
\ No newline at end of file
+    status = Column(String(50))  # Draft / Dispatched / Completed / Cancelled (app/core/trip_states.py)
+    # Set when dispatching moved the vehicle and driver to "On Trip"; only
+    # such trips release them again
+    resources_claimed = Column(Boolean, default=False, nullable=False, server_default="0")
+    # UTC; set by the Completed transition (lane statistics catch-up)
+    completed_at = Column(DateTime, nullable=True)
+
+    vehicle = relationship("Vehicle", back_populates="trips", lazy="raise_on_sql")
+    driver = relationship("Driver", back_populates="trips", lazy="raise_on_sql")
+    expenses = relationship("Expense", back_populates="trip", lazy="raise_on_sql", order_by="Expense.id")
+
+    __table_args__ = (
+        # Ranked keyword search over routes (GET /search); MySQL only.
+        Index("ft_trips_origin_destination", "origin", "destination", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+        # Per-depot status counts (GET /analytics/dashboard)
+        Index("ix_trips_depot_status", "depot_id", "status"),
+        # Trips completed since the last lane statistics catch-up
+        Index("ix_trips_depot_completed_at", "depot_id", "completed_at"),
+    )
@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import Column, Integer, String, Float, Index
+from sqlalchemy.orm import relationship
 from app.core.database import Base
+from app.core.tenancy import DepotScoped
 
-class Vehicle(Base):
+class Vehicle(DepotScoped, Base):
     __tablename__ = "vehicles"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -10,4 +12,14 @@ class Vehicle(Base):
     type = Column(String(50))
     capacity = Column(Float)
     odometer = Column(Float)
-    status = Column(String(50))
\ No newline at end of file
+    status = Column(String(50))
+
+    # Relationships never lazy-load with SQL; eager-load them explicitly
+    # (selectinload / joinedload) so list endpoints can't turn into N+1 queries.
+    trips = relationship("Trip", back_populates="vehicle", lazy="raise_on_sql")
+    maintenance_records = relationship("Maintenance", back_populates="vehicle", lazy="raise_on_sql")
+
+    __table_args__ = (
+        # Per-depot status counts (GET /analytics/dashboard)
+        Index("ix_vehicles_depot_status", "depot_id", "status"),
+    )
@@ -8,9 +8,15 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from .vehicle import VehicleCreate, VehicleResponse
     from .driver import DriverCreate, DriverResponse
-    from .trip import TripCreate, TripResponse
+    from .trip import TripCreate, TripResponse, TripTransition, TripDetailResponse
     from .maintenance import MaintenanceCreate, MaintenanceResponse
     from .expense import ExpenseCreate, ExpenseResponse
+    from .search import SearchResult, SearchResponse
+    from .import_job import ImportJobResponse
+    from .profile import ProfileSummary
+    from .compliance import ExpiringDriver
+    from .telemetry import TelemetryReadingCreate, TelemetryBatch, TelemetryAccepted
+    from .analytics import DashboardResponse, LaneStats, LanesResponse
 
 __all__ = [
     "VehicleCreate",
@@ -19,8 +25,21 @@ __all__ = [
     "DriverResponse",
     "TripCreate",
     "TripResponse",
+    "TripTransition",
+    "TripDetailResponse",
     "MaintenanceCreate",
     "MaintenanceResponse",
     "ExpenseCreate",
     "ExpenseResponse",
+    "SearchResult",
+    "SearchResponse",
+    "ImportJobResponse",
+    "ProfileSummary",
+    "ExpiringDriver",
+    "TelemetryReadingCreate",
+    "TelemetryBatch",
+    "TelemetryAccepted",
+    "DashboardResponse",
+    "LaneStats",
+    "LanesResponse",
 ]
\ No newline at end of file
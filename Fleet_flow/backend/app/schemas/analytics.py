@@ -0,0 +1,57 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+class VehicleCounts(BaseModel):
+    total: int
+    available: int
+    on_trip: int
+    in_shop: int
+    by_status: dict[str, int]
+
+class DriverCounts(BaseModel):
+    total: int
+    on_duty: int
+    by_status: dict[str, int]
+
+class TripCounts(BaseModel):
+    total: int
+    active: int  # Dispatched
+    by_status: dict[str, int]
+
+class MaintenanceCounts(BaseModel):
+    total: int
+    open: int
+    by_status: dict[str, int]
+
+class CostTotals(BaseModel):
+    fuel: float
+    misc: float
+    maintenance: float
+    total: float
+
+class DashboardResponse(BaseModel):
+    depot_id: str
+    vehicles: VehicleCounts
+    drivers: DriverCounts
+    trips: TripCounts
+    maintenance: MaintenanceCounts
+    costs: CostTotals
+
+class LaneStats(BaseModel):
+    origin: str
+    destination: str
+    vehicle_type: str
+    trips: int
+    # Fuel cost per unit of cargo weight
+    fuel_per_weight_mean: Optional[float] = None
+    fuel_per_weight_variance: Optional[float] = None
+    fuel_per_weight_stddev: Optional[float] = None
+    fuel_cost_mean: Optional[float] = None
+    misc_cost_mean: Optional[float] = None
+    # Mean |actual fuel cost - fuel_estimate| over trips that had an estimate
+    estimate_mae: Optional[float] = None
+
+class LanesResponse(BaseModel):
+    lanes: list[LaneStats]
+    has_more: bool
@@ -0,0 +1,10 @@
+from datetime import date
+
+from pydantic import BaseModel
+
+class ExpiringDriver(BaseModel):
+    driver_id: int
+    name: str
+    license_number: str
+    expiry_date: date
+    days_left: int  # negative once expired
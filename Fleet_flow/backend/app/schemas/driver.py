@@ -8,6 +8,7 @@ class DriverCreate(BaseModel):
 
 class DriverResponse(DriverCreate):
     id: int
+    depot_id: str
 
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -7,6 +7,7 @@ class ExpenseCreate(BaseModel):
 
 class ExpenseResponse(ExpenseCreate):
     id: int
+    depot_id: str
 
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Json
+
+class ImportRowError(BaseModel):
+    row: Optional[int]  # None for file-level errors
+    error: str
+
+class ImportJobResponse(BaseModel):
+    id: str
+    depot_id: str
+    kind: str
+    filename: str
+    on_conflict: str
+    status: str
+    rows_processed: int
+    inserted: int
+    updated: int
+    skipped: int
+    failed: int
+    errors: Json[list[ImportRowError]]
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -9,6 +9,7 @@ class MaintenanceCreate(BaseModel):
 
 class MaintenanceResponse(MaintenanceCreate):
     id: int
+    depot_id: str
 
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -0,0 +1,18 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+class LayerTime(BaseModel):
+    ms: float
+    percent: float
+
+class ProfileSummary(BaseModel):
+    id: str
+    method: str
+    path: str
+    status_code: Optional[int]
+    started_at: float
+    duration_ms: float
+    interval_ms: float
+    samples: int
+    layers: dict[str, LayerTime]
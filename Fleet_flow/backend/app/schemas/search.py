@@ -0,0 +1,16 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+class SearchResult(BaseModel):
+    kind: Literal["vehicle", "driver", "trip"]
+    id: int
+    label: str
+    score: float
+
+class SearchResponse(BaseModel):
+    query: str
+    limit: int
+    offset: int
+    has_more: bool
+    results: list[SearchResult]
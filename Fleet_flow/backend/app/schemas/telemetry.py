@@ -0,0 +1,28 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+from app.core.config import TELEMETRY_MAX_BATCH
+
+class TelemetryReadingCreate(BaseModel):
+    vehicle_id: int
+    recorded_at: datetime
+    odometer: Optional[float] = Field(None, ge=0)
+    fuel_liters: Optional[float] = Field(None, ge=0)  # fill-ups only
+    fuel_cost: Optional[float] = Field(None, ge=0)
+
+    @field_validator("recorded_at")
+    @classmethod
+    def to_naive_utc(cls, value: datetime) -> datetime:
+        # Stored like every other DateTime column here: naive UTC
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+class TelemetryBatch(BaseModel):
+    readings: list[TelemetryReadingCreate] = Field(..., min_length=1, max_length=TELEMETRY_MAX_BATCH)
+
+class TelemetryAccepted(BaseModel):
+    accepted: int
+    rejected_vehicle_ids: list[int]  # not found in this depot; their readings were dropped
@@ -1,4 +1,10 @@
-from pydantic import BaseModel
+from typing import Literal, Optional
+
+from pydantic import BaseModel, computed_field
+
+from app.schemas.driver import DriverResponse
+from app.schemas.expense import ExpenseResponse
+from app.schemas.vehicle import VehicleResponse
 
 class TripCreate(BaseModel):
     vehicle_id: int
@@ -6,11 +12,37 @@ class TripCreate(BaseModel):
     origin: str
     destination: str
     cargo_weight: float
-    fuel_estimate: float
-    status: str
+    # Estimated fuel cost; omit to fill it in from the lane's history
+    fuel_estimate: Optional[float] = None
+    # New trips always start as Draft; other states are reached through
+    # PATCH /trips/{id}/transition. "Draft" or its legacy aliases are accepted.
+    status: Optional[str] = None
 
 class TripResponse(TripCreate):
     id: int
+    depot_id: str
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class TripTransition(BaseModel):
+    status: Literal["Dispatched", "Completed", "Cancelled"]
+    # Optional guard: fail with 409 unless the trip is currently in this state
+    expected_status: Optional[str] = None
+
+class TripCostTotals(BaseModel):
+    fuel_cost: float
+    misc_cost: float
+    total_cost: float
+
+class TripDetailResponse(TripResponse):
+    vehicle: Optional[VehicleResponse]
+    driver: Optional[DriverResponse]
+    expenses: list[ExpenseResponse]
+
+    @computed_field
+    @property
+    def totals(self) -> TripCostTotals:
+        fuel = sum(e.fuel_cost or 0 for e in self.expenses)
+        misc = sum(e.misc_cost or 0 for e in self.expenses)
+        return TripCostTotals(fuel_cost=fuel, misc_cost=misc, total_cost=fuel + misc)
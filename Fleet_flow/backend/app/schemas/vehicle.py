@@ -10,6 +10,7 @@ class VehicleCreate(BaseModel):
 
 class VehicleResponse(VehicleCreate):
     id: int
+    depot_id: str
 
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""Production server entry point.
+
+Runs FleetFlow under uvicorn's process manager with one worker per CPU by
+default:
+
+    python -m app.server
+    python -m app.server --workers 8 --port 8000
+
+The schema is created once here, before the workers start, instead of once per
+worker. On SIGTERM/SIGINT uvicorn stops accepting connections, lets in-flight
+requests finish for up to --graceful-timeout seconds, then runs each worker's
+lifespan shutdown (which disposes the connection pools).
+
+For development keep using ``uvicorn app.main:app --reload``.
+"""
+
+import argparse
+import logging
+import os
+
+import uvicorn
+
+from app.core.config import (
+    ENVIRONMENT,
+    SERVER_GRACEFUL_TIMEOUT,
+    SERVER_HOST,
+    SERVER_PORT,
+    SERVER_WORKERS,
+)
+from app.core.startup import SCHEMA_READY_ENV, create_schema
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the FleetFlow API with multiple worker processes.")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--graceful-timeout", type=int, default=SERVER_GRACEFUL_TIMEOUT,
+                        help="Seconds to let in-flight requests finish on shutdown")
+    parser.add_argument("--skip-create-schema", action="store_true",
+                        help="Assume tables already exist (e.g. managed by migrations)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if not args.skip_create_schema:
+        from app.core.database import dispose_engines
+
+        create_schema()
+        # Workers are spawned fresh and open their own pools; don't keep the
+        # supervisor's connections around.
+        dispose_engines()
+    # Inherited by the workers, whose lifespan then skips create_all.
+    os.environ[SCHEMA_READY_ENV] = "1"
+
+    logger.info(f"Starting FleetFlow ({ENVIRONMENT}) on {args.host}:{args.port} with {args.workers} workers")
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        proxy_headers=True,
+        access_log=ENVIRONMENT != "production",
+    )
+
+
+if __name__ == "__main__":
+    main()
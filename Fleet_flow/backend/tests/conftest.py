@@ -0,0 +1,137 @@
+"""Shared fixtures: the app runs against a throwaway SQLite database.
+
+Settings are fixed here, before anything under ``app`` is imported, because
+app.core.config reads the environment at import time. Background loops
+(compliance checker, lane refresher, search reloader) are disabled; tests
+drive them by calling their refresh functions directly.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+_db_dir = tempfile.mkdtemp(prefix="fleetflow-tests-")
+
+os.environ.update({
+    "DB_USER": "test",
+    "DB_PASSWORD": "test",
+    "DB_NAME": "test",
+    "DB_ECHO": "false",
+    "DB_POOL_WARM": "1",
+    "RATE_LIMIT_ENABLED": "false",
+    "COMPLIANCE_CHECK_SECONDS": "0",
+    "LANE_REFRESH_SECONDS": "0",
+    "SEARCH_INDEX_RELOAD_SECONDS": "0",
+    "DASHBOARD_CACHE_SECONDS": "0",
+    "TELEMETRY_FLUSH_MS": "20",
+})
+
+import app.core.config as config  # noqa: E402
+
+config.DATABASE_URL = f"sqlite:///{_db_dir}/fleetflow.db"
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(autouse=True)
+def clean_state(client):
+    """Empty every table and in-process index between tests."""
+    from app.core.compliance import deadline_heaps
+    from app.core.database import Base, engine
+    from app.core.lane_stats import lane_indexes
+    from app.core.search_index import search_indexes
+    import app.crud.compliance as compliance
+
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+    search_indexes.clear()
+    lane_indexes.clear()
+    deadline_heaps.clear()
+    compliance._fired.clear()
+    yield
+
+
+@pytest.fixture
+def db():
+    from app.core.database import depot_session
+
+    session = depot_session(config.DEFAULT_DEPOT)
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_vehicle(client):
+    def make(plate, depot=None, **fields):
+        data = {"plate": plate, "model": "Volvo FH", "type": "Truck", "capacity": 10,
+                "odometer": 0, "status": "Available", **fields}
+        response = client.post("/vehicles/", json=data, headers=depot_headers(depot))
+        assert response.status_code in (200, 201), response.text
+        return response.json()
+    return make
+
+
+@pytest.fixture
+def make_driver(client):
+    def make(license_number, depot=None, **fields):
+        data = {"name": "Asha", "license_number": license_number, "expiry_date": "2030-01-01",
+                "status": "On Duty", **fields}
+        response = client.post("/drivers/", json=data, headers=depot_headers(depot))
+        assert response.status_code in (200, 201), response.text
+        return response.json()
+    return make
+
+
+@pytest.fixture
+def make_trip(client):
+    def make(vehicle_id, driver_id, depot=None, **fields):
+        data = {"vehicle_id": vehicle_id, "driver_id": driver_id, "origin": "Pune",
+                "destination": "Mumbai", "cargo_weight": 10, **fields}
+        response = client.post("/trips/", json=data, headers=depot_headers(depot))
+        assert response.status_code == 201, response.text
+        return response.json()
+    return make
+
+
+def depot_headers(depot=None) -> dict:
+    return {"X-Depot": depot} if depot else {}
+
+
+class QueryCounter:
+    """Collects the SELECT statements sent to the default engine inside a ``with`` block."""
+
+    def __init__(self):
+        self.statements = []
+
+    def __enter__(self):
+        from sqlalchemy import event
+        from app.core.database import engine
+
+        event.listen(engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        from sqlalchemy import event
+        from app.core.database import engine
+
+        event.remove(engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            self.statements.append(statement)
@@ -0,0 +1,59 @@
+import threading
+from datetime import date, timedelta
+
+import pytest
+
+import app.core.config as config
+import app.crud.compliance as compliance
+from app.core.compliance import DRIVER_LICENSE, deadline_heaps
+
+
+def test_alert_fires_once_and_fired_set_is_pruned(make_driver):
+    driver = make_driver("DL-1", expiry_date=(date.today() + timedelta(days=5)).isoformat())
+
+    fired = compliance.check_alerts()
+    assert [(a.entity_id, a.threshold_days) for a in fired] == [(driver["id"], 7)]
+    assert compliance.check_alerts() == []
+    assert len(compliance._fired) == 1
+
+    # Renewed (or removed) drivers leave the heap; their keys are dropped
+    deadline_heaps[config.DEFAULT_DEPOT].discard(DRIVER_LICENSE, driver["id"])
+    compliance.check_alerts()
+    assert compliance._fired == set()
+
+
+def test_expiring_drivers_endpoint(client, make_driver):
+    soon = make_driver("DL-1", expiry_date=(date.today() + timedelta(days=3)).isoformat())
+    make_driver("DL-2", expiry_date=(date.today() + timedelta(days=300)).isoformat())
+
+    response = client.get("/drivers/expiring", params={"within": "30d"})
+
+    assert [d["driver_id"] for d in response.json()] == [soon["id"]]
+
+
+def test_checker_starts_and_retries_when_the_first_load_fails(monkeypatch):
+    loads = []
+    checked = threading.Event()
+
+    def load_deadlines():
+        loads.append(1)
+        if len(loads) == 1:
+            raise RuntimeError("database is down")
+        compliance._loaded = True
+
+    def check_alerts():
+        # Park the thread after its first pass
+        compliance.COMPLIANCE_CHECK_SECONDS = 3600
+        checked.set()
+
+    monkeypatch.setattr(compliance, "load_deadlines", load_deadlines)
+    monkeypatch.setattr(compliance, "check_alerts", check_alerts)
+    monkeypatch.setattr(compliance, "COMPLIANCE_CHECK_SECONDS", 0.01)
+    monkeypatch.setattr(compliance, "_loaded", False)
+    monkeypatch.setattr(compliance, "_checker", None)
+
+    with pytest.raises(RuntimeError):
+        compliance.start_compliance()
+
+    assert checked.wait(5)
+    assert len(loads) == 2
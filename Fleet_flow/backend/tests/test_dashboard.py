@@ -0,0 +1,50 @@
+import app.core.config as config
+import app.crud.analytics as analytics
+from app.models.trip import Trip
+from conftest import QueryCounter, depot_headers
+
+
+def _maintenance(client, vehicle_id, status, cost):
+    response = client.post("/maintenance/", json={"vehicle_id": vehicle_id, "issue": "Brakes",
+                                                  "date": "2030-01-01", "status": status, "cost": cost})
+    assert response.status_code in (200, 201), response.text
+
+
+def test_dashboard_summarises_the_depot_in_one_query(client, db, make_vehicle, make_driver, make_trip):
+    vehicle = make_vehicle("KA-01-0001")
+    make_vehicle("KA-01-0002", status="In Shop")
+    driver = make_driver("DL-1")
+    trip = make_trip(vehicle["id"], driver["id"])
+    client.patch(f"/trips/{trip['id']}/transition", json={"status": "Dispatched"})
+    client.post("/expenses/", json={"trip_id": trip["id"], "fuel_cost": 100.5, "misc_cost": 20})
+    _maintenance(client, vehicle["id"], "Open", 300)
+    _maintenance(client, vehicle["id"], "Completed", 50)
+    # Legacy rows count under their canonical state
+    db.add(Trip(vehicle_id=vehicle["id"], driver_id=driver["id"], origin="Pune", destination="Goa",
+                cargo_weight=5, status="Delivered", depot_id=config.DEFAULT_DEPOT))
+    db.commit()
+    make_vehicle("KA-01-0003", depot="north")
+
+    with QueryCounter() as counter:
+        summary = client.get("/analytics/dashboard").json()
+
+    assert len(counter.statements) == 1
+    assert summary["vehicles"] == {"total": 2, "available": 0, "on_trip": 1, "in_shop": 1,
+                                   "by_status": {"On Trip": 1, "In Shop": 1}}
+    assert summary["drivers"]["on_duty"] == 0
+    assert summary["trips"]["by_status"] == {"Draft": 0, "Dispatched": 1, "Completed": 1, "Cancelled": 0}
+    assert summary["trips"]["active"] == 1
+    assert (summary["maintenance"]["total"], summary["maintenance"]["open"]) == (2, 1)
+    assert summary["costs"] == {"fuel": 100.5, "misc": 20, "maintenance": 350, "total": 470.5}
+
+
+def test_dashboard_is_cached_per_depot(client, make_vehicle, monkeypatch):
+    monkeypatch.setattr(analytics, "DASHBOARD_CACHE_SECONDS", 60)
+    monkeypatch.setattr(analytics, "_dashboard_cache", {})
+    make_vehicle("KA-01-0001")
+
+    assert client.get("/analytics/dashboard").json()["vehicles"]["total"] == 1
+    make_vehicle("KA-01-0002")
+    assert client.get("/analytics/dashboard").json()["vehicles"]["total"] == 1
+    north = client.get("/analytics/dashboard", headers=depot_headers("north")).json()
+    assert (north["depot_id"], north["vehicles"]["total"]) == ("north", 0)
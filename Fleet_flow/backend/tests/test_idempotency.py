@@ -0,0 +1,82 @@
+import asyncio
+import json
+import uuid
+
+from app.core.idempotency import DatabaseIdempotencyStore, IdempotencyMiddleware, StoredResponse
+
+
+def _key() -> dict:
+    return {"Idempotency-Key": uuid.uuid4().hex}
+
+
+def _vehicle(plate="KA-01-1234") -> dict:
+    return {"plate": plate, "model": "Volvo FH", "type": "Truck", "capacity": 10, "odometer": 0,
+            "status": "Available"}
+
+
+def test_retry_replays_first_response(client):
+    headers = _key()
+    first = client.post("/vehicles/", json=_vehicle(), headers=headers)
+    second = client.post("/vehicles/", json=_vehicle(), headers=headers)
+
+    assert second.status_code == first.status_code
+    assert second.json() == first.json()
+    assert second.headers["idempotent-replayed"] == "true"
+    assert len(client.get("/vehicles/").json()) == 1
+
+
+def test_same_key_with_different_body_is_rejected(client):
+    headers = _key()
+    client.post("/vehicles/", json=_vehicle(), headers=headers)
+
+    response = client.post("/vehicles/", json=_vehicle("KA-01-9999"), headers=headers)
+
+    assert response.status_code == 422
+
+
+def test_reserialized_json_body_is_the_same_request(client):
+    headers = {**_key(), "Content-Type": "application/json"}
+    first = client.post("/vehicles/", content=json.dumps(_vehicle()), headers=headers)
+    reordered = dict(reversed(list(_vehicle().items())))
+    second = client.post("/vehicles/", content=json.dumps(reordered, indent=2), headers=headers)
+
+    assert second.status_code == first.status_code
+    assert second.headers["idempotent-replayed"] == "true"
+
+
+def test_database_store_keeps_its_cache_bounded(client):
+    store = DatabaseIdempotencyStore(max_keys=3)
+    for i in range(10):
+        key = f"bounded-{i}"
+        assert store.claim(key, "fp") is None
+        store.complete(key, StoredResponse(fingerprint="fp", expires_at=2**40, status_code=201))
+
+    assert len(store._entries) == 3
+
+
+def test_app_reads_original_channel_after_the_body():
+    received = []
+
+    async def app(scope, receive, send):
+        received.append(await receive())
+        received.append(await receive())
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    messages = [
+        {"type": "http.request", "body": b"{}", "more_body": False},
+        {"type": "http.disconnect", "from": "client"},
+    ]
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "POST", "path": "/x",
+             "headers": [(b"idempotency-key", uuid.uuid4().hex.encode())]}
+    asyncio.run(IdempotencyMiddleware(app)(scope, receive, send))
+
+    assert received[0]["body"] == b"{}"
+    assert received[1] == {"type": "http.disconnect", "from": "client"}
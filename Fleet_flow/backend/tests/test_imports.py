@@ -0,0 +1,50 @@
+import time
+
+from app.crud.search import load_search_index
+import app.core.config as config
+
+VEHICLE_HEADER = "plate,model,type,capacity,odometer,status\n"
+
+
+def _import(client, kind: str, csv_text: str, **params) -> dict:
+    response = client.post(f"/import/{kind}", params=params,
+                           files={"file": (f"{kind}.csv", csv_text.encode(), "text/csv")})
+    assert response.status_code == 202, response.text
+    job_id = response.json()["id"]
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        job = client.get(f"/import/{job_id}").json()
+        if job["status"] in ("Completed", "Failed"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"Import {job_id} did not finish")
+
+
+def test_import_inserts_and_reports_bad_rows(client):
+    job = _import(client, "vehicles", VEHICLE_HEADER
+                  + "KA-01-0001,Volvo FH,Truck,10,0,Available\n"
+                  + "KA-01-0002,Volvo FH,Truck,not-a-number,0,Available\n")
+
+    assert job["status"] == "Completed"
+    assert (job["inserted"], job["failed"]) == (1, 1)
+    assert job["errors"][0]["row"] == 3
+
+
+def test_import_matches_existing_keys_case_insensitively(client, make_vehicle):
+    make_vehicle("KA-01-0001")
+
+    job = _import(client, "vehicles", VEHICLE_HEADER + "ka-01-0001 ,Tata Prima,Truck,12,0,Available\n")
+
+    assert (job["inserted"], job["updated"]) == (0, 1)
+    vehicles = client.get("/vehicles/").json()
+    assert [v["model"] for v in vehicles] == ["Tata Prima"]
+
+
+def test_imported_updates_are_searchable(client, make_vehicle):
+    make_vehicle("KA-01-0001", model="Volvo FH")
+    load_search_index(config.DEFAULT_DEPOT)
+
+    _import(client, "vehicles", VEHICLE_HEADER + "KA-01-0001,Tata Prima,Truck,12,0,Available\n")
+
+    results = client.get("/search/", params={"q": "prima"}).json()["results"]
+    assert [hit["kind"] for hit in results] == ["vehicle"]
@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+import app.core.config as config
+from app.core.lane_stats import lane_indexes
+from app.crud.lanes import rebuild_lane_index, refresh_lane_index
+from app.models.trip import Trip
+
+
+@pytest.fixture
+def fleet(make_vehicle, make_driver):
+    return {
+        "truck": make_vehicle("KA-01-0001", type="Truck")["id"],
+        "van": make_vehicle("KA-01-0002", type="Van")["id"],
+        "driver": make_driver("DL-1")["id"],
+    }
+
+
+def _trip(client, make_trip, fleet, vehicle="truck", complete=True, **fields):
+    trip = make_trip(fleet[vehicle], fleet["driver"], **fields)
+    if complete:
+        for target in ("Dispatched", "Completed"):
+            response = client.patch(f"/trips/{trip['id']}/transition", json={"status": target})
+            assert response.status_code == 200, response.text
+    return trip["id"]
+
+
+def _expense(client, trip_id, fuel, misc=0):
+    response = client.post("/expenses/", json={"trip_id": trip_id, "fuel_cost": fuel, "misc_cost": misc})
+    assert response.status_code == 201, response.text
+
+
+def _age(db, trip_id, hours=2):
+    # Moves a completion out of the catch-up window
+    db.execute(update(Trip).where(Trip.id == trip_id)
+               .values(completed_at=datetime.utcnow() - timedelta(hours=hours)))
+    db.commit()
+
+
+def _lanes():
+    return lane_indexes[config.DEFAULT_DEPOT].lanes()
+
+
+def _rebuilt(db):
+    rebuild_lane_index(db)
+    return _lanes()
+
+
+def _assert_same(incremental, rebuilt):
+    assert [(l["origin"], l["destination"], l["vehicle_type"], l["trips"]) for l in incremental] == \
+        [(l["origin"], l["destination"], l["vehicle_type"], l["trips"]) for l in rebuilt]
+    for a, b in zip(incremental, rebuilt):
+        for field in ("fuel_per_weight_mean", "fuel_per_weight_variance", "fuel_cost_mean",
+                      "misc_cost_mean", "estimate_mae"):
+            assert a[field] == pytest.approx(b[field]), field
+
+
+def test_catch_up_matches_a_rebuild(client, db, make_trip, fleet):
+    old = _trip(client, make_trip, fleet, cargo_weight=10, fuel_estimate=90)
+    _expense(client, old, 100, 5)
+    _age(db, old)
+    legacy = _trip(client, make_trip, fleet, cargo_weight=4)
+    _expense(client, legacy, 30)
+    db.execute(update(Trip).where(Trip.id == legacy).values(status="Delivered", completed_at=None))
+    db.commit()
+    recent = _trip(client, make_trip, fleet, cargo_weight=6)
+    _expense(client, recent, 70)
+    rebuild_lane_index(db)
+    index = lane_indexes[config.DEFAULT_DEPOT]
+    assert set(index._recent) == {recent}
+
+    # New expenses on trips held only in the lane sums, a new completion,
+    # a trip that was aggregated without expenses, and a route variant
+    # that differs only in case and spacing
+    _expense(client, old, 20, 1)
+    _expense(client, legacy, 10)
+    fresh = _trip(client, make_trip, fleet, vehicle="van", cargo_weight=5)
+    _expense(client, fresh, 50)
+    bare = _trip(client, make_trip, fleet, cargo_weight=8)
+    _age(db, bare)
+    _expense(client, bare, 40)
+    _trip(client, make_trip, fleet, cargo_weight=2, origin="  PUNE ", destination="mumbai")
+    refresh_lane_index(db)
+    incremental = _lanes()
+
+    _assert_same(incremental, _rebuilt(db))
+    truck = next(l for l in incremental if l["vehicle_type"] == "truck")
+    assert truck["trips"] == 4
+
+
+def test_only_completed_trips_are_counted(client, db, make_trip, fleet):
+    running = _trip(client, make_trip, fleet, complete=False)
+    _expense(client, running, 100)
+    rebuild_lane_index(db)
+
+    assert _lanes() == []
+
+    for target in ("Dispatched", "Completed"):
+        client.patch(f"/trips/{running}/transition", json={"status": target})
+    refresh_lane_index(db)
+
+    assert [l["trips"] for l in _lanes()] == [1]
+
+
+def test_only_trips_inside_the_window_keep_a_sample(client, db, make_trip, fleet):
+    trips = [_trip(client, make_trip, fleet) for _ in range(3)]
+    for trip_id in trips:
+        _expense(client, trip_id, 10)
+    rebuild_lane_index(db)
+    index = lane_indexes[config.DEFAULT_DEPOT]
+    assert set(index._recent) == set(trips)
+
+    # A later completion moves the window past the first three
+    for trip_id in trips:
+        _age(db, trip_id)
+    late = _trip(client, make_trip, fleet)
+    _expense(client, late, 10)
+    rebuild_lane_index(db)
+    assert set(index._recent) == {late}
+    assert [l["trips"] for l in _lanes()] == [4]
+
+
+def test_new_expense_on_a_recent_trip_applies_without_a_refresh(client, db, make_trip, fleet):
+    trip = _trip(client, make_trip, fleet, cargo_weight=10)
+    _expense(client, trip, 100)
+    rebuild_lane_index(db)
+
+    _expense(client, trip, 50)
+
+    assert _lanes()[0]["fuel_cost_mean"] == 150
@@ -0,0 +1,68 @@
+import threading
+import time
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.profiling import ProfileStore, ProfilingMiddleware, ProfiledRoute, _thread_profiles
+
+
+def _busy_endpoint_body():
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _idle_neighbour(stop: threading.Event):
+    while not stop.is_set():
+        _busy_neighbour_body()
+
+
+def _busy_neighbour_body():
+    sum(range(1000))
+
+
+def _app(store: ProfileStore) -> FastAPI:
+    router = APIRouter(route_class=ProfiledRoute)
+
+    @router.get("/work")
+    def work():
+        _busy_endpoint_body()
+        return {"ok": True}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(ProfilingMiddleware, store=store, sample_percent=100, interval_ms=1)
+    return app
+
+
+def test_profile_samples_only_the_requests_threadpool_thread():
+    store = ProfileStore()
+    stop = threading.Event()
+    neighbour = threading.Thread(target=_idle_neighbour, args=(stop,), daemon=True)
+    neighbour.start()
+    try:
+        with TestClient(_app(store)) as client:
+            response = client.get("/work")
+    finally:
+        stop.set()
+        neighbour.join()
+
+    profile = store.get(response.headers["x-profile-id"])
+    stacks = "\n".join(profile["stacks"])
+    assert "_busy_endpoint_body" in stacks
+    assert "_busy_neighbour_body" not in stacks
+    assert _thread_profiles == {}
+
+
+def test_unprofiled_request_marks_no_thread():
+    store = ProfileStore()
+    app = _app(store)
+    app.user_middleware.clear()
+    app.add_middleware(ProfilingMiddleware, store=store, sample_percent=0)
+
+    with TestClient(app) as client:
+        assert client.get("/work").json() == {"ok": True}
+
+    assert store.list() == []
+    assert _thread_profiles == {}
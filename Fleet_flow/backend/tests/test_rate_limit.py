@@ -0,0 +1,110 @@
+import asyncio
+
+from app.core.rate_limit import (
+    ANALYTICS,
+    EXPORTS,
+    READS,
+    WRITES,
+    ConcurrencyLimiter,
+    LoadShedMiddleware,
+    RateLimiter,
+    RateLimitMiddleware,
+    classify,
+    parse_rate,
+)
+
+
+def _limits(rate="1/2") -> dict:
+    return {route_class: parse_rate(rate) for route_class in (READS, WRITES, ANALYTICS, EXPORTS)}
+
+
+def test_classify_routes():
+    assert classify("GET", "/health") is None
+    assert classify("OPTIONS", "/trips/") is None
+    assert classify("GET", "/trips/") == READS
+    assert classify("PATCH", "/trips/1/transition") == WRITES
+    assert classify("GET", "/analytics/dashboard") == ANALYTICS
+    assert classify("POST", "/import/vehicles") == EXPORTS
+    assert classify("GET", "/import/jobs/1") == READS
+
+
+def test_bucket_allows_burst_then_asks_to_retry():
+    limiter = RateLimiter(_limits("1/2"))
+
+    assert limiter.check("a", READS) == 0
+    assert limiter.check("a", READS) == 0
+    assert limiter.check("a", READS) > 0
+    # Other clients and route classes have their own buckets
+    assert limiter.check("b", READS) == 0
+    assert limiter.check("a", WRITES) == 0
+
+
+def test_bucket_table_is_bounded():
+    limiter = RateLimiter(_limits(), max_buckets=3)
+    for i in range(10):
+        limiter.check(f"client-{i}", READS)
+
+    assert len(limiter._buckets) == 3
+
+
+def test_writes_keep_reserved_slots_when_reads_are_saturated():
+    limiter = ConcurrencyLimiter(4, write_reserve=0.25)
+
+    assert [limiter.acquire(READS) for _ in range(4)] == [True, True, True, False]
+    assert limiter.acquire(WRITES)
+    assert not limiter.acquire(WRITES)
+    assert limiter.stats()["shed"] == 2
+
+    limiter.release(READS)
+    assert limiter.acquire(WRITES)
+
+
+def test_analytics_capped_at_half_of_shared_slots():
+    limiter = ConcurrencyLimiter(8, write_reserve=0.25)
+
+    granted = sum(limiter.acquire(ANALYTICS) for _ in range(8))
+
+    assert granted == limiter.limits[ANALYTICS] == 3
+    assert limiter.acquire(READS)
+
+
+def _call(middleware, method="GET", path="/trips/") -> list:
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "headers": [], "client": ("10.0.0.1", 1234)}
+    asyncio.run(middleware(scope, receive, send))
+    return sent
+
+
+async def _ok(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def test_rate_limit_middleware_answers_429_with_retry_after():
+    middleware = RateLimitMiddleware(_ok, RateLimiter(_limits("0.5/1")))
+
+    assert _call(middleware)[0]["status"] == 200
+    limited = _call(middleware)[0]
+    assert limited["status"] == 429
+    assert dict(limited["headers"])[b"retry-after"] == b"2"
+    assert _call(middleware, path="/health")[0]["status"] == 200
+
+
+def test_load_shed_middleware_answers_503_and_releases_slots():
+    limiter = ConcurrencyLimiter(1)
+    middleware = LoadShedMiddleware(_ok, limiter)
+
+    assert _call(middleware)[0]["status"] == 200
+    assert limiter.total == 0
+
+    limiter.acquire(WRITES)
+    shed = _call(middleware)[0]
+    assert shed["status"] == 503
+    assert b"retry-after" in dict(shed["headers"])
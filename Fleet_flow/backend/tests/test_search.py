@@ -0,0 +1,46 @@
+from app.core.search_index import SHORT_QUERY_CANDIDATES, SearchIndex, search_indexes
+from app.crud.search import load_search_index
+import app.core.config as config
+
+
+def _index() -> SearchIndex:
+    index = SearchIndex()
+    index.enabled = True
+    return index
+
+
+def test_short_query_scores_a_bounded_candidate_set():
+    index = _index()
+    for i in range(SHORT_QUERY_CANDIDATES * 5):
+        index.add("vehicle", i, f"v{i}", identifiers=(f"KA{i:05d}",))
+
+    assert len(index._candidates("ka")) == SHORT_QUERY_CANDIDATES
+    assert len(index.search("ka", limit=10)) == 10
+
+
+def test_short_query_finds_exact_identifier_first():
+    index = _index()
+    index.add("vehicle", 1, "long", identifiers=("ab123",))
+    index.add("vehicle", 2, "short", identifiers=("ab",))
+
+    assert index.search("ab")[0]["id"] == 2
+
+
+def test_search_endpoint_finds_new_vehicle(client, make_vehicle):
+    vehicle = make_vehicle("MH-12-4321", model="Tata Prima")
+
+    response = client.get("/search/", params={"q": "prima"})
+
+    assert response.status_code == 200
+    ids = [(hit["kind"], hit["id"]) for hit in response.json()["results"]]
+    assert ("vehicle", vehicle["id"]) in ids
+
+
+def test_reload_builds_into_a_fresh_index(client, make_vehicle):
+    make_vehicle("MH-12-0001")
+    live = search_indexes[config.DEFAULT_DEPOT]
+    live.enabled = True
+
+    load_search_index(config.DEFAULT_DEPOT)
+
+    assert len(live) == 1
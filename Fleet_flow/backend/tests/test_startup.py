@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+import time
+
+from conftest import BACKEND_DIR
+
+from app.core.startup import register_warmup, startup_timer
+
+
+def test_deferred_routers_are_not_imported_with_the_app():
+    code = (
+        "import sys, app.core.config as c; c.DATABASE_URL = 'sqlite:///unused.db'; import app.main as m; "
+        "print(','.join(n for n in m.DEFERRED_ROUTER_MODULES if n in sys.modules))"
+    )
+    env = {**os.environ, "DB_USER": "u", "DB_PASSWORD": "p", "DB_NAME": "n", "DB_ECHO": "false"}
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == ""
+
+
+def test_deferred_routers_serve_their_first_request(client, make_vehicle):
+    vehicle = make_vehicle("KA-01-1234")
+
+    assert client.get("/analytics/dashboard").status_code == 200
+    assert "/telemetry/" in client.get("/openapi.json").json()["paths"]
+    assert "import:app.api.telemetry" in startup_timer.phases
+
+    # The telemetry buffer's warm-up ran when its module was imported late
+    reading = {"vehicle_id": vehicle["id"], "recorded_at": "2030-01-01T00:00:00Z", "odometer": 120}
+    assert client.post("/telemetry/", json={"readings": [reading]}).status_code == 202
+    for _ in range(100):
+        if client.get("/vehicles/").json()[0]["odometer"] == 120:
+            break
+        time.sleep(0.02)
+    assert client.get("/vehicles/").json()[0]["odometer"] == 120
+
+
+def test_warmup_registered_after_startup_runs_immediately(client):
+    calls = []
+    register_warmup("test:late", lambda: calls.append(1))
+
+    assert calls == [1]
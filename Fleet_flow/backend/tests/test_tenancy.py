@@ -0,0 +1,61 @@
+from app.core.lane_stats import lane_indexes
+from app.crud.lanes import refresh_lane_indexes
+from conftest import depot_headers
+
+
+def _complete(client, trip_id, depot=None):
+    for target in ("Dispatched", "Completed"):
+        response = client.patch(f"/trips/{trip_id}/transition", json={"status": target},
+                                headers=depot_headers(depot))
+        assert response.status_code == 200, response.text
+
+
+def test_depots_only_see_their_own_rows(client, make_vehicle):
+    make_vehicle("KA-01-0001")
+    make_vehicle("KA-01-0002", depot="north")
+
+    assert [v["plate"] for v in client.get("/vehicles/").json()] == ["KA-01-0001"]
+    north = client.get("/vehicles/", headers=depot_headers("north")).json()
+    assert [(v["plate"], v["depot_id"]) for v in north] == [("KA-01-0002", "north")]
+
+
+def test_duplicate_natural_keys_are_409_across_depots(client, make_vehicle, make_driver):
+    make_vehicle("KA-01-0001")
+    make_driver("DL-1")
+
+    vehicle = {"plate": "KA-01-0001", "model": "Volvo FH", "type": "Truck", "capacity": 10,
+               "odometer": 0, "status": "Available"}
+    driver = {"name": "Ravi", "license_number": "DL-1", "expiry_date": "2030-01-01", "status": "On Duty"}
+    assert client.post("/vehicles/", json=vehicle, headers=depot_headers("north")).status_code == 409
+    assert client.post("/drivers/", json=driver).status_code == 409
+
+
+def _completed_trip_with_expense(client, make_vehicle, make_driver, make_trip, depot):
+    vehicle, driver = make_vehicle("KA-01-0001", depot=depot), make_driver("DL-1", depot=depot)
+    trip = make_trip(vehicle["id"], driver["id"], depot=depot)
+    response = client.post("/expenses/", json={"trip_id": trip["id"], "fuel_cost": 100, "misc_cost": 10},
+                           headers=depot_headers(depot))
+    assert response.status_code == 201
+    _complete(client, trip["id"], depot=depot)
+
+
+def _lanes(client, depot=None):
+    lanes = client.get("/analytics/lanes", headers=depot_headers(depot)).json()["lanes"]
+    return [(lane["origin"], lane["trips"], lane["fuel_cost_mean"]) for lane in lanes]
+
+
+def test_lanes_of_an_unconfigured_depot_load_on_first_use(client, make_vehicle, make_driver, make_trip):
+    _completed_trip_with_expense(client, make_vehicle, make_driver, make_trip, "north")
+    lane_indexes.clear()
+
+    assert _lanes(client, "north") == [("pune", 1, 100)]
+    assert _lanes(client) == []
+
+
+def test_background_refresh_covers_depots_loaded_on_demand(client, make_vehicle, make_driver, make_trip):
+    # Creating the trip loads "north" (fuel estimate); the refresh then keeps it current
+    _completed_trip_with_expense(client, make_vehicle, make_driver, make_trip, "north")
+
+    refresh_lane_indexes()
+
+    assert _lanes(client, "north") == [("pune", 1, 100)]
@@ -0,0 +1,42 @@
+from conftest import QueryCounter, depot_headers
+
+
+def _expense(client, trip_id, fuel, misc, depot=None):
+    response = client.post("/expenses/", json={"trip_id": trip_id, "fuel_cost": fuel, "misc_cost": misc},
+                           headers=depot_headers(depot))
+    assert response.status_code == 201, response.text
+
+
+def test_trip_detail_includes_relations_and_totals(client, make_vehicle, make_driver, make_trip):
+    vehicle, driver = make_vehicle("KA-01-0001"), make_driver("DL-1")
+    trip = make_trip(vehicle["id"], driver["id"])
+    _expense(client, trip["id"], 100, 20)
+    _expense(client, trip["id"], 50, 5)
+
+    detail = client.get(f"/trips/{trip['id']}").json()
+
+    assert detail["vehicle"]["plate"] == "KA-01-0001"
+    assert detail["driver"]["license_number"] == "DL-1"
+    assert [e["fuel_cost"] for e in detail["expenses"]] == [100, 50]
+    assert detail["totals"] == {"fuel_cost": 150, "misc_cost": 25, "total_cost": 175}
+
+
+def test_trip_detail_missing_or_other_depot_is_404(client, make_vehicle, make_driver, make_trip):
+    trip = make_trip(make_vehicle("KA-01-0001")["id"], make_driver("DL-1")["id"])
+
+    assert client.get("/trips/999999").status_code == 404
+    assert client.get(f"/trips/{trip['id']}", headers=depot_headers("north")).status_code == 404
+
+
+def test_expanded_page_loads_in_two_queries(client, make_vehicle, make_driver, make_trip):
+    vehicle, driver = make_vehicle("KA-01-0001"), make_driver("DL-1")
+    trips = [make_trip(vehicle["id"], driver["id"]) for _ in range(5)]
+    for trip in trips:
+        _expense(client, trip["id"], 10, 1)
+
+    with QueryCounter() as counter:
+        page = client.get("/trips/expanded", params={"limit": 3, "offset": 1}).json()
+
+    assert [t["id"] for t in page] == [t["id"] for t in trips[1:4]]
+    assert all(t["totals"]["total_cost"] == 11 for t in page)
+    assert len(counter.statements) == 2
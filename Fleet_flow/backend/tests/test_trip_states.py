@@ -0,0 +1,63 @@
+import app.core.config as config
+from app.models.driver import Driver
+from app.models.trip import Trip
+from app.models.vehicle import Vehicle
+
+
+def _transition(client, trip_id, status, **fields):
+    return client.patch(f"/trips/{trip_id}/transition", json={"status": status, **fields})
+
+
+def _statuses(db, vehicle_id, driver_id):
+    db.expire_all()
+    return db.get(Vehicle, vehicle_id).status, db.get(Driver, driver_id).status
+
+
+def test_new_trip_is_draft_without_a_status(make_vehicle, make_driver, make_trip):
+    trip = make_trip(make_vehicle("KA-01-0001")["id"], make_driver("DL-1")["id"])
+
+    assert trip["status"] == "Draft"
+
+
+def test_new_trip_cannot_skip_dispatch(client, make_vehicle, make_driver):
+    data = {"vehicle_id": make_vehicle("KA-01-0001")["id"], "driver_id": make_driver("DL-1")["id"],
+            "origin": "Pune", "destination": "Mumbai", "cargo_weight": 10, "status": "In Progress"}
+
+    assert client.post("/trips/", json=data).status_code == 400
+
+
+def test_dispatch_claims_and_complete_releases(client, db, make_vehicle, make_driver, make_trip):
+    vehicle, driver = make_vehicle("KA-01-0001"), make_driver("DL-1")
+    trip = make_trip(vehicle["id"], driver["id"])
+
+    assert _transition(client, trip["id"], "Dispatched").status_code == 200
+    assert _statuses(db, vehicle["id"], driver["id"]) == ("On Trip", "On Trip")
+
+    assert _transition(client, trip["id"], "Completed").json()["status"] == "Completed"
+    assert _statuses(db, vehicle["id"], driver["id"]) == ("Available", "On Duty")
+
+
+def test_vehicle_cannot_be_dispatched_twice(client, make_vehicle, make_driver, make_trip):
+    vehicle = make_vehicle("KA-01-0001")
+    first = make_trip(vehicle["id"], make_driver("DL-1")["id"])
+    second = make_trip(vehicle["id"], make_driver("DL-2")["id"])
+
+    assert _transition(client, first["id"], "Dispatched").status_code == 200
+    assert _transition(client, second["id"], "Dispatched").status_code == 409
+    assert _transition(client, first["id"], "Dispatched").status_code == 409
+
+
+def test_legacy_in_progress_trip_completes_without_releasing(client, db, make_vehicle, make_driver):
+    # A vehicle already on another trip must keep its status when a legacy
+    # row, which never claimed it, is completed.
+    vehicle = make_vehicle("KA-01-0001", status="On Trip")
+    driver = make_driver("DL-1", status="On Trip")
+    legacy = Trip(vehicle_id=vehicle["id"], driver_id=driver["id"], origin="Pune", destination="Mumbai",
+                  cargo_weight=10, status="In Progress", depot_id=config.DEFAULT_DEPOT)
+    db.add(legacy)
+    db.commit()
+
+    response = _transition(client, legacy.id, "Completed")
+
+    assert response.status_code == 200, response.text
+    assert _statuses(db, vehicle["id"], driver["id"]) == ("On Trip", "On Trip")
@@ -0,0 +1,81 @@
+import time
+
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.core.write_buffer import WriteBuffer
+from app.crud.telemetry import is_transient
+
+
+class Transient(Exception):
+    pass
+
+
+def _buffer(flush, **kwargs) -> WriteBuffer:
+    options = {"capacity": 100, "flush_size": 10, "flush_interval": 0.01,
+               "is_transient": lambda e: isinstance(e, Transient), "retries": 2, "retry_backoff": 0}
+    return WriteBuffer("test", flush, **{**options, **kwargs})
+
+
+def _failing(times: int, error: Exception, written: list):
+    calls = []
+
+    def flush(partition, rows):
+        calls.append(rows)
+        if len(calls) <= times:
+            raise error
+        written.extend(rows)
+    return flush
+
+
+def test_transient_error_is_retried():
+    written = []
+    buffer = _buffer(_failing(2, Transient("deadlock"), written))
+    buffer.offer("main", [1, 2, 3])
+
+    buffer.stop()
+
+    assert written == [1, 2, 3]
+    assert buffer.stats()["retried"] == 2
+    assert buffer.stats()["dropped"] == 0
+
+
+def test_permanent_error_drops_rows_without_retrying():
+    written = []
+    buffer = _buffer(_failing(1, ValueError("bad row"), written))
+    buffer.offer("main", [1, 2])
+
+    buffer.stop()
+
+    assert written == []
+    assert (buffer.dropped, buffer.retried) == (2, 0)
+
+
+def test_rows_are_requeued_in_order_while_the_database_is_down():
+    written = []
+    buffer = _buffer(_failing(4, Transient("gone away"), written))
+    buffer.offer("main", [1, 2])
+    buffer.start()
+    buffer.offer("main", [3])
+
+    deadline = time.monotonic() + 5
+    while len(written) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    buffer.stop()
+
+    assert written[:2] == [1, 2] and sorted(written) == [1, 2, 3]
+    assert buffer.requeued >= 2
+    assert buffer.dropped == 0
+
+
+def test_stop_drops_rows_that_still_fail():
+    buffer = _buffer(_failing(100, Transient("gone away"), []))
+    buffer.offer("main", [1, 2])
+
+    buffer.stop()
+
+    assert (buffer.dropped, len(buffer)) == (2, 0)
+
+
+def test_telemetry_classifies_database_errors():
+    assert is_transient(OperationalError("INSERT", {}, Exception("Deadlock found")))
+    assert not is_transient(IntegrityError("INSERT", {}, Exception("Duplicate entry")))
@@ -8,7 +8,7 @@ export interface Trip {
   destination: string;
   cargo_weight: number;
   fuel_estimate: number;
-  status: string;
+  status?: string;
 }
 
 export interface TripCreate {
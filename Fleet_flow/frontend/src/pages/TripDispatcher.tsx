@@ -19,7 +19,6 @@ export default function TripDispatcher() {
     destination: "",
     cargo_weight: 0,
     fuel_estimate: 0,
-    status: "Pending",
   });
 
   const handleDispatch = async (e: React.FormEvent) => {
@@ -41,7 +40,6 @@ export default function TripDispatcher() {
         destination: "",
         cargo_weight: 0,
         fuel_estimate: 0,
-        status: "Pending",
       });
       await refetch();
     } catch (err) {
@@ -171,19 +169,6 @@ export default function TripDispatcher() {
                   className="w-full px-3 py-2 text-sm rounded-lg border border-input bg-background focus:outline-none focus:ring-2 focus:ring-ring/30"
                 />
               </div>
-              <div className="space-y-1.5">
-                <label className="text-sm font-medium text-foreground">Status</label>
-                <select
-                  value={formData.status}
-                  onChange={(e) => setFormData({ ...formData, status: e.target.value })}
-                  className="w-full px-3 py-2 text-sm rounded-lg border border-input bg-background focus:outline-none focus:ring-2 focus:ring-ring/30"
-                >
-                  <option>Pending</option>
-                  <option>In Progress</option>
-                  <option>Completed</option>
-                  <option>Cancelled</option>
-                </select>
-              </div>
             </div>
             <button
               type="submit"